@@ -0,0 +1,67 @@
+"""
+Compares the throughput of hash_text from crypto_corgi.py, which reduces each
+power as it goes, against the original version, which adds up the full powers
+and only reduces at the end. Checks that both give the same hashes.
+
+Run from this directory: python benchmark_hash.py
+"""
+
+import random
+import time
+from crypto_corgi import BASE, HASH_SIZE, hash_text
+
+SIZES = [100, 1_000, 10_000, 100_000]
+# The original version gets slow quickly, so it is only run on the smaller sizes.
+ORIGINAL_LIMIT = 10_000
+MIN_SECONDS = 0.2
+
+
+def hash_text_original(message: str, base: int, hash_size: int) -> int:
+    """
+    Hashes a message the way hash_text used to, with full-size powers.
+
+    Args:
+        message (str): The text message to be hashed.
+        base (int): The base value for the hashing formula.
+        hash_size (int): The size of the hash table.
+    Returns:
+        int: The hashed integer value of the message.
+    """
+    hashed_values = []
+    for i, c in enumerate(message):
+        hashed_values.append((i + base) ** (ord(c)))
+    return sum(hashed_values) % hash_size
+
+
+def throughput(hasher, message: str) -> float:
+    """
+    Hashes the message repeatedly for at least MIN_SECONDS.
+
+    Args:
+        hasher: The hash function to time.
+        message (str): The message to hash.
+    Returns:
+        float: The throughput in megabytes of message per second.
+    """
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        hasher(message, BASE, HASH_SIZE)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return len(message) * runs / elapsed / 1e6
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    for size in SIZES:
+        message = "".join(chr(rng.randrange(32, 127)) for _ in range(size))
+        reduced = throughput(hash_text, message)
+        line = f"{size:>7} chars: reduced {reduced:8.3f} MB/s"
+        if size <= ORIGINAL_LIMIT:
+            for base, hash_size in [(BASE, HASH_SIZE), (11, 100), (-7, 97), (3, 1)]:
+                assert hash_text(message, base, hash_size) == hash_text_original(message, base, hash_size)
+            original = throughput(hash_text_original, message)
+            line += f", original {original:8.3f} MB/s ({reduced / original:.1f}x faster)"
+        print(line)
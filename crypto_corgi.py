@@ -69,6 +69,9 @@ assert_equal(decrypt_text("sdws ~gdqd", -1), "text!here")
 def hash_text(message: str, base: int, hash_size: int) -> int:
     """
     Uniquely hashes a text message into an integer value.
+    Each term (i + base) ** ord(c) is reduced mod hash_size as it is computed,
+    so the numbers never grow past hash_size. The result is the same as adding
+    up the full powers and reducing at the end.
     
     Args:
         message(str): The text message to be hashed.
@@ -77,14 +80,16 @@ def hash_text(message: str, base: int, hash_size: int) -> int:
     Returns:
         int: The hashed integer value of the message.
     """
-    hashed_values = []
+    total = 0
     for i, c in enumerate(message):
-        hashed_values.append((i + base) ** (ord(c)))
-    return sum(hashed_values) % hash_size
+        total = (total + pow(i + base, ord(c), hash_size)) % hash_size
+    return total
 
 assert_equal(hash_text("A", 11, 100), 51)
 assert_equal(hash_text("AB", 11, 100), 35)
 assert_equal(hash_text("ABC", 11, 100), 52)
+assert_equal(hash_text("", 11, 100), 0)
+assert_equal(hash_text("Hello world!", 31, 10**9), 533815340)
 
 ROTATION = 4
 BASE = 31
@@ -259,9 +264,6 @@ assert_equal(
 )
 
 
-# Comment out this line to skip running the actual server.
-start_server(State("", "", ""))
-
 # 4) Define main
 def main():
     """
@@ -289,4 +291,7 @@ def main():
     else:
         print("Please enter a valid action.")
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    # Comment out this line to skip running the actual server.
+    start_server(State("", "", ""))
+    main()
@@ -0,0 +1,64 @@
+"""
+Batched simulation: many patterns padded into one (patterns, rows, cols) array
+and stepped together with a single set of array operations per generation.
+"""
+
+from pathlib import Path
+from typing import Iterable
+import csv
+import numpy as np
+import numpy.typing as npt
+from rules import CONWAY, Rule
+from vectorized import OFFSETS, lookup
+
+Batch = npt.NDArray[np.bool_]
+Cells = tuple[int, int, list[tuple[int, int]]]
+
+
+def stack(patterns: Iterable[Cells]) -> tuple[Batch, Batch]:
+    """The padded batch, and a mask of each pattern's own rows x cols within it."""
+    patterns = list(patterns)
+    rows = max((p[0] for p in patterns), default=0)
+    cols = max((p[1] for p in patterns), default=0)
+    batch = np.zeros((len(patterns), rows, cols), dtype=np.bool_)
+    mask = np.zeros_like(batch)
+    for i, (r, c, cells) in enumerate(patterns):
+        mask[i, :r, :c] = True
+        if cells:
+            batch[(i, *zip(*cells))] = True
+    return batch, mask
+
+
+def step(batch: Batch, mask: Batch, rule: Rule = CONWAY) -> Batch:
+    n, rows, cols = batch.shape
+    padded = np.pad(batch.view(np.uint8), ((0, 0), (1, 1), (1, 1)))
+    counts = np.zeros((n, rows, cols), dtype=np.uint8)
+    for dr, dc in OFFSETS:
+        counts += padded[:, 1 + dr : 1 + dr + rows, 1 + dc : 1 + dc + cols]
+    if rule == CONWAY:
+        new = (counts == 3) | (batch & (counts == 2))
+    else:
+        new = lookup(rule)[batch.view(np.uint8), counts]
+    # Cells outside a pattern's own board stay dead, so every pattern keeps the
+    # same clipped edges it would have if it were stepped on its own.
+    return new & mask
+
+
+def populations(patterns: Iterable[Cells], generations: int, rule: Rule = CONWAY) -> npt.NDArray[np.int64]:
+    """Population of every pattern at generations 0..N, one column per pattern."""
+    batch, mask = stack(patterns)
+    series = np.zeros((generations + 1, len(batch)), dtype=np.int64)
+    series[0] = batch.sum(axis=(1, 2))
+    for generation in range(1, generations + 1):
+        batch = step(batch, mask, rule)
+        series[generation] = batch.sum(axis=(1, 2))
+    return series
+
+
+def write_csv(path: Path, names: list[str], series: npt.NDArray[np.int64]):
+    """Columnar layout: one row per generation, one column per pattern."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["generation", *names])
+        for generation, row in enumerate(series.tolist()):
+            writer.writerow([generation, *row])
@@ -0,0 +1,82 @@
+from hashlib import blake2b
+from typing import Any, Iterable, NamedTuple
+
+
+class Board(NamedTuple):
+    """Each row packed into one int: bit c is the cell in column c. About one bit per cell."""
+
+    rows: int
+    cols: int
+    bits: list[int]
+
+
+def from_cells(rows: int, cols: int, cells: Iterable[tuple[int, int]]) -> Board:
+    bits = [0] * rows
+    for r, c in cells:
+        bits[r] |= 1 << c
+    return Board(rows, cols, bits)
+
+
+def to_grid(board: Board) -> list[list[bool]]:
+    return [[bool(row >> c & 1) for c in range(board.cols)] for row in board.bits]
+
+
+def to_array(board: Board) -> Any:
+    import numpy as np
+
+    width = (board.cols + 7) // 8
+    packed = np.frombuffer(b"".join(row.to_bytes(width, "little") for row in board.bits), dtype=np.uint8)
+    bits = np.unpackbits(packed.reshape(board.rows, width), axis=1, count=board.cols, bitorder="little")
+    return bits.astype(np.bool_)
+
+
+def population(board: Board) -> int:
+    return sum(row.bit_count() for row in board.bits)
+
+
+def fingerprint(board: Board) -> tuple[bytes, tuple[int, int, int, int]]:
+    """Hash of the live cells relative to their bounding box, and the box (see cycles.py)."""
+    live = [r for r, row in enumerate(board.bits) if row]
+    if not live:
+        return b"", (0, 0, 0, 0)
+    top, bottom = live[0], live[-1] + 1
+    rows = board.bits[top:bottom]
+    # (row & -row) is the lowest set bit, so its bit_length() - 1 is the leftmost live column.
+    left = min((row & -row).bit_length() for row in rows if row) - 1
+    right = max(row.bit_length() for row in rows)
+    width = (right - left + 7) // 8
+    digest = blake2b(f"{bottom - top}x{right - left}".encode(), digest_size=16)
+    digest.update(b"".join((row >> left).to_bytes(width, "little") for row in rows))
+    return digest.digest(), (top, left, bottom, right)
+
+
+def full_adder(x: int, y: int, z: int) -> tuple[int, int]:
+    """Bitwise x + y + z for every column at once, as (sum, carry)."""
+    partial = x ^ y
+    return partial ^ z, (x & y) | (partial & z)
+
+
+def step_row(above: int, row: int, below: int, mask: int, alive: int) -> int:
+    # The eight neighbours of every cell in the row, as eight bit planes. Shifting
+    # left brings column c - 1 into column c; the mask clips the right edge and
+    # the shift itself clips the left one.
+    ones_a, twos_a = full_adder((above << 1) & mask, above, above >> 1)
+    ones_b, twos_b = full_adder((below << 1) & mask, below, below >> 1)
+    left, right = (row << 1) & mask, row >> 1
+    ones_c, twos_c = left ^ right, left & right
+
+    ones, twos_d = full_adder(ones_a, ones_b, ones_c)
+    twos_e, fours_a = full_adder(twos_a, twos_b, twos_c)
+    twos, fours_b = twos_e ^ twos_d, twos_e & twos_d
+    fours = fours_a ^ fours_b
+    # Counts only reach 8, which reads as 0 here; neither 0 nor 8 survives or births,
+    # so B3/S23 is "exactly the twos bit, no fours bit, plus ones or already alive".
+    return twos & ~fours & (ones | alive) & mask
+
+
+def step(board: Board) -> Board:
+    mask = (1 << board.cols) - 1
+    bits = board.bits
+    padded = [0, *bits, 0]
+    new = [step_row(padded[r], padded[r + 1], padded[r + 2], mask, bits[r]) for r in range(board.rows)]
+    return Board(board.rows, board.cols, new)
@@ -0,0 +1,268 @@
+"""
+Pattern catalog: a persistent index over a pattern file so that listing patterns
+or loading one of them does not parse the whole library.
+
+The index lives next to the library as "<file>.idx" (JSON) and records, for each
+pattern, its byte range in the file, its size and its population. A TOML pattern
+whose bytes cannot be split out reliably gets a length of -1 and is read with a
+full parse instead.
+
+The index is used as is while the library's mtime and size match the ones it
+stored. If either has changed, the library's SHA-256 is compared with the stored
+one: the same contents only refresh the stored mtime, and different contents
+rebuild the index. An index from another INDEX_VERSION is always rebuilt.
+
+Two formats are understood: TOML files with [patterns.<name>] tables (the format
+of patterns.toml) and RLE files (*.rle), which may hold several patterns one
+after another, each named by its "#N" comment line.
+"""
+
+from hashlib import sha256
+from pathlib import Path
+from typing import NamedTuple
+import json
+import re
+import tomllib
+
+ALIVE = "O1#"
+INDEX_VERSION = 2
+WHOLE_FILE = -1
+
+
+class Entry(NamedTuple):
+    offset: int
+    length: int
+    rows: int
+    cols: int
+    population: int
+
+
+Cells = tuple[int, int, list[tuple[int, int]]]
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+TOML_HEADER = re.compile(rb"\s*\[\[?\s*patterns\s*\.")
+TRIPLE_QUOTE = re.compile(rb'"""|\'\'\'')
+
+
+def header_pattern(line: bytes) -> str | None:
+    """The pattern a [patterns.<name>...] header line belongs to, if it parses alone."""
+    try:
+        patterns = tomllib.loads(line.decode()).get("patterns", {})
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError):
+        return None
+    return next(iter(patterns), None)
+
+
+def segments(path: Path) -> list[tuple[int, bytes]]:
+    """Split the library into (byte offset, raw bytes) chunks, one per pattern."""
+    is_rle = path.suffix.lower() == ".rle"
+    data = path.read_bytes()
+    chunks: list[tuple[int, bytes]] = []
+    start = None
+    current = None
+    offset = 0
+    in_string: bytes | None = None  # the quotes of the open multi-line string
+    for line in data.splitlines(keepends=True):
+        if is_rle:
+            if start is None and line.strip():
+                start = offset
+            if start is not None and b"!" in line and not line.startswith(b"#"):
+                chunks.append((start, data[start : offset + len(line)]))
+                start = None
+        else:
+            # A line starting with "[" inside a multi-line string is not a header, and a
+            # sub-table such as [patterns.dot.meta] stays with its pattern.
+            if not in_string and TOML_HEADER.match(line):
+                name = header_pattern(line)
+                if start is None or name is None or name != current:
+                    if start is not None:
+                        chunks.append((start, data[start:offset]))
+                    start = offset
+                    current = name
+            for quotes in TRIPLE_QUOTE.findall(line):
+                if in_string is None:
+                    in_string = quotes
+                elif quotes == in_string:
+                    in_string = None
+        offset += len(line)
+    if not is_rle and start is not None:
+        chunks.append((start, data[start:]))
+    return chunks
+
+
+def _read(path: Path, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def toml_section(chunk: bytes) -> tuple[str, dict[str, object]]:
+    (name, table), *_ = tomllib.loads(chunk.decode()).get("patterns", {}).items()
+    return name, table
+
+
+def parse_toml(name: str, data: dict[str, object]) -> Cells:
+    rows = data.get("rows")
+    cols = data.get("cols")
+    pattern = data.get("pattern")
+
+    if not isinstance(rows, int) or not isinstance(cols, int) or not isinstance(pattern, str) or not rows or not cols:
+        raise ValueError(f"{name} must define 'rows', 'cols', and 'pattern'")
+
+    lines = pattern.splitlines()
+
+    if len(lines) != rows:
+        raise ValueError(f"Expected {rows} rows, got {len(lines)}")
+
+    for i, line in enumerate(lines, 1):
+        if len(line) != cols:
+            raise ValueError(f"Line {i}: expected {cols}, got {len(line)} — {repr(line)}")
+
+    cells = [(r, c) for r, line in enumerate(lines) for c, ch in enumerate(line) if ch in ALIVE]
+
+    return rows, cols, cells
+
+
+RLE_HEADER = re.compile(r"x\s*=\s*(\d+)\s*,\s*y\s*=\s*(\d+)")
+RLE_TOKEN = re.compile(r"(\d*)([^\d\s])")
+
+
+def rle_name(chunk: bytes) -> str | None:
+    for line in chunk.decode().splitlines():
+        if line.startswith("#N"):
+            return line[2:].strip()
+    return None
+
+
+def parse_rle(name: str, chunk: bytes) -> Cells:
+    lines = [line for line in chunk.decode().splitlines() if not line.startswith("#")]
+    if not lines or not (header := RLE_HEADER.match(lines[0].strip())):
+        raise ValueError(f"{name} has no 'x = ..., y = ...' RLE header")
+    cols, rows = int(header[1]), int(header[2])
+    cells: list[tuple[int, int]] = []
+    r = c = 0
+    for count, tag in RLE_TOKEN.findall("".join(lines[1:])):
+        n = int(count or 1)
+        if tag == "!":
+            break
+        if tag == "$":
+            r += n
+            c = 0
+        elif tag == "b":
+            c += n
+        else:
+            # "o", or any other state of a multi-state rule, is a live cell.
+            cells.extend((r, c + i) for i in range(n))
+            c += n
+    for r, c in cells:
+        if r >= rows or c >= cols:
+            raise ValueError(f"{name}: cell ({r}, {c}) lies outside the declared {cols}x{rows}")
+    return rows, cols, cells
+
+
+def toml_entry(offset: int, length: int, table: object) -> Entry:
+    table = table if isinstance(table, dict) else {}
+    rows, cols = table.get("rows", 0), table.get("cols", 0)
+    pattern = table.get("pattern", "")
+    population = sum(pattern.count(ch) for ch in ALIVE) if isinstance(pattern, str) else 0
+    return Entry(offset, length, rows, cols, population)  # type:ignore
+
+
+def build_toml_index(path: Path) -> dict[str, Entry]:
+    # Indexing is rare, so check every chunk against one full parse: any pattern
+    # whose chunk does not parse to the same table is read from the whole file.
+    patterns = tomllib.loads(path.read_text()).get("patterns", {})
+    chunks: dict[str, tuple[int, int]] = {}
+    for offset, chunk in segments(path):
+        try:
+            name, table = toml_section(chunk)
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError, ValueError):
+            continue
+        if name in chunks or patterns.get(name) != table:
+            chunks[name] = (WHOLE_FILE, WHOLE_FILE)
+        else:
+            chunks[name] = (offset, len(chunk))
+    return {name: toml_entry(*chunks.get(name, (WHOLE_FILE, WHOLE_FILE)), table) for name, table in patterns.items()}
+
+
+def build_index(path: Path) -> dict[str, Entry]:
+    if path.suffix.lower() != ".rle":
+        return build_toml_index(path)
+    entries: dict[str, Entry] = {}
+    for i, (offset, chunk) in enumerate(segments(path)):
+        name = rle_name(chunk) or f"{path.stem}_{i}"
+        header = RLE_HEADER.search(chunk.decode())
+        cols, rows = (int(header[1]), int(header[2])) if header else (0, 0)
+        population = len(parse_rle(name, chunk)[2]) if header else 0
+        entries[name] = Entry(offset, len(chunk), rows, cols, population)
+    return entries
+
+
+def file_hash(path: Path) -> str:
+    with open(path, "rb") as f:
+        return sha256(f.read()).hexdigest()
+
+
+def load_index(path: Path) -> dict[str, Entry]:
+    """The index for a pattern library, rebuilding (and saving) it if it is stale."""
+    stat = path.stat()
+    cache = index_path(path)
+    stored = None
+    try:
+        with open(cache) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if stored and stored.get("version") == INDEX_VERSION:
+        if stored["mtime_ns"] == stat.st_mtime_ns and stored["size"] == stat.st_size:
+            return {name: Entry(*entry) for name, entry in stored["patterns"].items()}
+        digest = file_hash(path)
+        if stored["sha256"] == digest:
+            stored["mtime_ns"] = stat.st_mtime_ns
+            save_index(cache, stored)
+            return {name: Entry(*entry) for name, entry in stored["patterns"].items()}
+    else:
+        digest = file_hash(path)
+
+    entries = build_index(path)
+    save_index(
+        cache,
+        {
+            "version": INDEX_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "patterns": {name: list(entry) for name, entry in entries.items()},
+        },
+    )
+    return entries
+
+
+def save_index(cache: Path, data: dict[str, object]):
+    try:
+        with open(cache, "w") as f:
+            json.dump(data, f)
+    except OSError:
+        pass  # A read-only library still works, it just re-indexes every run.
+
+
+def names(path: Path) -> list[str]:
+    return list(load_index(path))
+
+
+def load_cells(path: Path, name: str) -> Cells:
+    """Rows, columns and live cells of one pattern, reading only its bytes."""
+    entry = load_index(path).get(name)
+    if entry is None:
+        raise ValueError(f"Unknown pattern: '{name}'")
+    if entry.length == WHOLE_FILE:
+        return parse_toml(name, tomllib.loads(path.read_text())["patterns"][name])
+    chunk = _read(path, entry.offset, entry.offset + entry.length)
+    if path.suffix.lower() == ".rle":
+        return parse_rle(name, chunk)
+    return parse_toml(name, toml_section(chunk)[1])
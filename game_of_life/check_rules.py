@@ -0,0 +1,73 @@
+"""
+Rule-space check: steps random boards with the sparse and NumPy engines under a
+sweep of B/S rules, with and without wrap-around, and fails on the first
+generation where they disagree.
+
+    python check_rules.py
+"""
+
+import random
+import sys
+import numpy as np
+import sparse
+import vectorized
+from rules import parse_rule
+
+RULES = [
+    "B3/S23",
+    "B36/S23",
+    "B3678/S34678",
+    "B2/S",
+    "B1/S1",
+    "B3/S023",
+    "B3/S0123",
+    "B35678/S5678",
+    "B12345678/S012345678",
+    "B3/S012345678",
+]
+SIZES = [(1, 1), (1, 7), (5, 5), (16, 23)]
+SEEDS = 5
+GENERATIONS = 12
+
+
+def check(rule_text: str, rows: int, cols: int, wrap: bool, seed: int) -> str | None:
+    """The first generation where the engines differ, described, or None if they agree."""
+    rule = parse_rule(rule_text)
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(rows) for c in range(cols) if rng.random() < 0.3]
+    board = sparse.from_cells(rows, cols, cells)
+    grid = vectorized.from_cells(rows, cols, cells)
+    for generation in range(1, GENERATIONS + 1):
+        board = sparse.step(board, rule, wrap)
+        grid = vectorized.step(grid, rule, wrap)
+        if not np.array_equal(vectorized.from_cells(rows, cols, board.cells), grid):
+            return f"{rule_text} {rows}x{cols} wrap={wrap} seed={seed}: differs at generation {generation}"
+    return None
+
+
+def main() -> int:
+    failures = [
+        failure
+        for rule in RULES
+        for rows, cols in SIZES
+        for wrap in (False, True)
+        for seed in range(SEEDS)
+        if (failure := check(rule, rows, cols, wrap, seed))
+    ]
+    # A lone cell is the smallest case for S0: it has no live neighbours at all.
+    for rule in RULES:
+        for wrap in (False, True):
+            lone = parse_rule(rule)
+            board = sparse.step(sparse.from_cells(5, 5, [(2, 2)]), lone, wrap)
+            grid = vectorized.step(vectorized.from_cells(5, 5, [(2, 2)]), lone, wrap)
+            if sparse.population(board) != vectorized.population(grid):
+                failures.append(f"{rule} wrap={wrap}: a single cell differs")
+    for failure in failures:
+        print(failure)
+    checked = len(RULES) * len(SIZES) * 2 * SEEDS
+    print(f"{checked} random boards x {GENERATIONS} generations: {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
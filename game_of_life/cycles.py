@@ -0,0 +1,110 @@
+"""
+Cycle detection: fingerprint every generation and notice when one repeats, so a
+batch run can stop as soon as a pattern has settled into a still life, an
+oscillator or a spaceship and extrapolate the rest.
+
+A fingerprint is a hash of the live cells relative to their bounding box, so a
+pattern that has moved still matches and the difference between the two boxes
+gives its displacement per period. fingerprint() computes one from a 2-D array;
+engines without an array of their own (sparse, bitboard) hash their own state
+instead, since only fingerprints from the same engine are ever compared. On the clipped grid engines a
+spaceship's extrapolation only holds until it reaches the edge, which
+stays_inside() checks.
+"""
+
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import NamedTuple
+import numpy as np
+import numpy.typing as npt
+
+# Generations remembered; periods longer than this go unnoticed.
+HISTORY = 4096
+
+
+class Cycle(NamedTuple):
+    start: int  # first generation of the repeating sequence
+    period: int
+    dr: int  # displacement per period
+    dc: int
+    empty: bool
+
+    @property
+    def kind(self) -> str:
+        if self.empty:
+            return "extinct"
+        if self.dr or self.dc:
+            return "spaceship"
+        return "still life" if self.period == 1 else "oscillator"
+
+
+# Bounding box of the live cells: top, left, bottom, right (bottom and right exclusive).
+Box = tuple[int, int, int, int]
+
+
+def fingerprint(image: npt.NDArray[np.generic]) -> tuple[bytes, Box]:
+    """Hash of the live cells relative to their bounding box, and the box."""
+    rows = np.flatnonzero(image.any(axis=1))
+    if not len(rows):
+        return b"", (0, 0, 0, 0)
+    cols = np.flatnonzero(image.any(axis=0))
+    top, left, bottom, right = int(rows[0]), int(cols[0]), int(rows[-1]) + 1, int(cols[-1]) + 1
+    crop = image[top:bottom, left:right].astype(np.bool_)
+    digest = blake2b(np.packbits(crop, axis=1).tobytes(), digest_size=16)
+    digest.update(np.array(crop.shape, dtype=np.int64).tobytes())
+    return digest.digest(), (top, left, bottom, right)
+
+
+class CycleDetector:
+    def __init__(self, history: int = HISTORY):
+        self.history = history
+        self.seen: OrderedDict[bytes, tuple[int, int, int]] = OrderedDict()
+        self.populations: OrderedDict[int, int] = OrderedDict()
+        self.boxes: OrderedDict[int, Box] = OrderedDict()
+        self.cycle: Cycle | None = None
+
+    def observe(self, generation: int, key: bytes, box: Box, population: int) -> Cycle | None:
+        """
+        Record a generation by its fingerprint (an empty key for an empty board); returns
+        the cycle once one generation repeats an earlier one.
+        """
+        top, left = box[:2]
+        self.populations[generation] = population
+        self.boxes[generation] = box
+        if key in self.seen:
+            first, first_top, first_left = self.seen[key]
+            self.cycle = Cycle(first, generation - first, top - first_top, left - first_left, not key)
+            return self.cycle
+        self.seen[key] = (generation, top, left)
+        if len(self.seen) > self.history:
+            _, (oldest, _, _) = self.seen.popitem(last=False)
+            while self.populations and next(iter(self.populations)) <= oldest:
+                self.populations.popitem(last=False)
+                self.boxes.popitem(last=False)
+        return None
+
+    def population_at(self, generation: int) -> int:
+        """Population at any generation from the cycle's start on, without stepping."""
+        assert self.cycle is not None
+        start, period = self.cycle.start, self.cycle.period
+        return self.populations[start + (generation - start) % period]
+
+    def stays_inside(self, rows: int, cols: int, generation: int) -> bool:
+        """
+        Whether a moving cycle keeps an empty cell between itself and every edge of a
+        rows x cols clipped board up to `generation`, so the edge cannot change it.
+        """
+        assert self.cycle is not None
+        start, period, dr, dc = self.cycle.start, self.cycle.period, self.cycle.dr, self.cycle.dc
+        phases = [self.boxes[g] for g in range(start, start + period)]
+        top = min(box[0] for box in phases)
+        left = min(box[1] for box in phases)
+        bottom = max(box[2] for box in phases)
+        right = max(box[3] for box in phases)
+        # The pattern moves in a straight line, so checking both ends covers the path.
+        for laps in (0, (generation - start) // period):
+            if top + laps * dr < 1 or left + laps * dc < 1:
+                return False
+            if bottom + laps * dr > rows - 1 or right + laps * dc > cols - 1:
+                return False
+        return True
@@ -0,0 +1,213 @@
+"""
+HashLife: Gosper's memoized quadtree algorithm for jumping far ahead in time.
+
+Unlike the grid engines, the universe here is unbounded: cells that would fall
+off the edge of the loaded pattern keep going, which is what you want for guns
+and breeders.
+"""
+
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Optional
+
+# Upper bound on memoized nodes/results. Least recently used entries are evicted
+# once a cache is full; evicted nodes are rebuilt on demand, so eviction only
+# costs time, never correctness.
+CACHE_SIZE = 1 << 20
+
+
+class Node:
+    """A 2**k x 2**k square split into quadrants a (nw), b (ne), c (sw), d (se)."""
+
+    __slots__ = ("k", "a", "b", "c", "d", "n", "_hash")
+
+    def __init__(self, k: int, a: "Node", b: "Node", c: "Node", d: "Node", n: int):
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.n = n
+        # Children are canonical while they are cached, so hashing by identity keeps
+        # hashing O(1) instead of walking the whole subtree.
+        self._hash = hash((k, id(a), id(b), id(c), id(d), n))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+
+# Single cells have no quadrants.
+ON = Node(0, None, None, None, None, 1)  # type: ignore[arg-type]
+OFF = Node(0, None, None, None, None, 0)  # type: ignore[arg-type]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def join(a: Node, b: Node, c: Node, d: Node) -> Node:
+    """The canonical node with the given quadrants."""
+    return Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+
+
+@lru_cache(maxsize=None)
+def zero(k: int) -> Node:
+    if k == 0:
+        return OFF
+    z = zero(k - 1)
+    return join(z, z, z, z)
+
+
+def centre(m: Node) -> Node:
+    """A node one level up with m in its middle and empty space around it."""
+    z = zero(m.k - 1)
+    return join(join(z, z, z, m.a), join(z, z, m.b, z), join(z, m.c, z, z), join(m.d, z, z, z))
+
+
+def life(cells: list[Node]) -> Node:
+    """Next state of the middle cell of a 3x3 block, given in row-major order."""
+    n = sum(cell.n for cell in cells) - cells[4].n
+    return ON if n == 3 or (n == 2 and cells[4].n) else OFF
+
+
+def life_4x4(m: Node) -> Node:
+    """The middle 2x2 of a level-2 node, one generation on."""
+    a, b, c, d = m.a, m.b, m.c, m.d
+    grid = [
+        [a.a, a.b, b.a, b.b],
+        [a.c, a.d, b.c, b.d],
+        [c.a, c.b, d.a, d.b],
+        [c.c, c.d, d.c, d.d],
+    ]
+
+    def next_cell(r: int, c: int) -> Node:
+        return life([grid[r + dr][c + dc] for dr in (-1, 0, 1) for dc in (-1, 0, 1)])
+
+    return join(next_cell(1, 1), next_cell(1, 2), next_cell(2, 1), next_cell(2, 2))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def successor(m: Node, j: int) -> Node:
+    """
+    The middle half of m (one level down), advanced 2**j generations.
+    Requires j <= m.k - 2.
+    """
+    if m.n == 0:
+        return zero(m.k - 1)
+    if m.k == 2:
+        return life_4x4(m)
+
+    a, b, c, d = m.a, m.b, m.c, m.d
+
+    # Nine overlapping sub-squares one level down, each advanced by j (or by j - 1
+    # when we need two half-steps to cover the full 2**(k-2) generations).
+    half = j if j < m.k - 2 else j - 1
+    c1 = successor(a, half)
+    c2 = successor(join(a.b, b.a, a.d, b.c), half)
+    c3 = successor(b, half)
+    c4 = successor(join(a.c, a.d, c.a, c.b), half)
+    c5 = successor(join(a.d, b.c, c.b, d.a), half)
+    c6 = successor(join(b.c, b.d, d.a, d.b), half)
+    c7 = successor(c, half)
+    c8 = successor(join(c.b, d.a, c.d, d.c), half)
+    c9 = successor(d, half)
+
+    if j < m.k - 2:
+        # The sub-squares already cover all 2**j generations; just take their middles.
+        return join(
+            join(c1.d, c2.c, c4.b, c5.a),
+            join(c2.d, c3.c, c5.b, c6.a),
+            join(c4.d, c5.c, c7.b, c8.a),
+            join(c5.d, c6.c, c8.b, c9.a),
+        )
+
+    return join(
+        successor(join(c1, c2, c4, c5), half),
+        successor(join(c2, c3, c5, c6), half),
+        successor(join(c4, c5, c7, c8), half),
+        successor(join(c5, c6, c8, c9), half),
+    )
+
+
+def build(k: int, cells: list[tuple[int, int]]) -> Node:
+    """A level-k node with the given live cells, relative to its top-left corner."""
+    if not cells:
+        return zero(k)
+    if k == 0:
+        return ON
+    half = 1 << (k - 1)
+    quadrants: list[list[tuple[int, int]]] = [[], [], [], []]
+    for r, c in cells:
+        down, right = r >= half, c >= half
+        quadrants[2 * down + right].append((r - half * down, c - half * right))
+    return join(*(build(k - 1, quadrant) for quadrant in quadrants))
+
+
+class Universe(NamedTuple):
+    root: Node
+    top: int  # row of the root's top-left cell, in pattern coordinates
+    left: int  # column of the root's top-left cell
+    generation: int
+
+
+def from_cells(rows: int, cols: int, cells: Iterable[tuple[int, int]]) -> Universe:
+    k = max(3, (max(rows, cols) - 1).bit_length())
+    return Universe(build(k, list(cells)), 0, 0, 0)
+
+
+def expand(universe: Universe) -> Universe:
+    root = universe.root
+    offset = 1 << (root.k - 1)
+    return Universe(centre(root), universe.top - offset, universe.left - offset, universe.generation)
+
+
+def is_padded(root: Node) -> bool:
+    """Whether every live cell sits in the middle quarter of the root."""
+    inner = root.a.d.d, root.b.c.c, root.c.b.b, root.d.a.a
+    return sum(node.n for node in inner) == root.n
+
+
+def advance(universe: Universe, generations: int) -> Universe:
+    """Jump `generations` ahead, one power-of-two successor per set bit."""
+    j = 0
+    while generations >> j:
+        if generations >> j & 1:
+            # Pad until the pattern cannot reach the edge of the result in 2**j steps.
+            while universe.root.k < j + 3 or not is_padded(universe.root):
+                universe = expand(universe)
+            root = universe.root
+            offset = 1 << (root.k - 2)
+            universe = Universe(
+                successor(root, j), universe.top + offset, universe.left + offset, universe.generation + (1 << j)
+            )
+        j += 1
+    return universe
+
+
+def population(universe: Universe) -> int:
+    return universe.root.n
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extent(node: Node) -> Optional[tuple[int, int, int, int]]:
+    """(top, left, bottom, right) of the live cells inside node, or None if it is empty."""
+    if node.n == 0:
+        return None
+    if node.k == 0:
+        return (0, 0, 0, 0)
+    half = 1 << (node.k - 1)
+    boxes = [
+        (box[0] + dr, box[1] + dc, box[2] + dr, box[3] + dc)
+        for child, dr, dc in ((node.a, 0, 0), (node.b, 0, half), (node.c, half, 0), (node.d, half, half))
+        if (box := extent(child))
+    ]
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
+
+
+def bounding_box(universe: Universe) -> Optional[tuple[int, int, int, int]]:
+    """(top, left, bottom, right) of the live cells in pattern coordinates, inclusive."""
+    box = extent(universe.root)
+    if box is None:
+        return None
+    return (box[0] + universe.top, box[1] + universe.left, box[2] + universe.top, box[3] + universe.left)
@@ -1,15 +1,18 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.13"
-# dependencies = ["matplotlib>=3.10.7"]
+# dependencies = ["matplotlib>=3.10.7", "numpy>=2.3"]
 # ///
 from argparse import ArgumentParser
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, NamedTuple
+import importlib
+import json
 import os
 import sys
-import tomllib
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+import time
+import catalog
 
 
 def neighbors(grid: list[list[bool]], r: int, c: int) -> int:
@@ -41,60 +44,220 @@ def step(grid: list[list[bool]]) -> list[list[bool]]:
     return new
 
 
-def load_grid(path: Path, name: str) -> list[list[bool]]:
-    with open(path, "rb") as f:
-        data = tomllib.load(f)
+def population(grid: list[list[bool]]) -> int:
+    return sum(sum(row) for row in grid)
 
-    patterns = data.get("patterns", {})
-    if name not in patterns:
-        raise ValueError(f"Unknown pattern: '{name}'")
 
-    data = patterns[name]
-
-    rows = data.get("rows")
-    cols = data.get("cols")
-    pattern = data.get("pattern")
+def grid_from_cells(rows: int, cols: int, cells: Iterable[tuple[int, int]]) -> list[list[bool]]:
+    grid = [[False] * cols for _ in range(rows)]
+    for r, c in cells:
+        grid[r][c] = True
+    return grid
 
-    if not rows or not cols or not pattern:
-        raise ValueError(f"{name} must define 'rows', 'cols', and 'pattern'")
 
-    lines = pattern.splitlines()
+def cells_of(grid: list[list[bool]]) -> Iterator[tuple[int, int]]:
+    for r, row in enumerate(grid):
+        for c, alive in enumerate(row):
+            if alive:
+                yield r, c
+
+
+class Engine(NamedTuple):
+    """A stepping backend: builds a board from live cells and advances it one generation."""
+
+    from_cells: Callable[[int, int, Iterable[tuple[int, int]]], Any]
+    step: Callable[[Any], Any]
+    to_grid: Callable[[Any], list[list[bool]]]
+    population: Callable[[Any], int]
+    # Optional fast path to a 2-D NumPy array for display; to_grid() is used otherwise.
+    to_array: Callable[[Any], Any] | None = None
+    # Optional engine-specific counters, merged into the --headless report.
+    stats: Callable[[Any], dict[str, Any]] | None = None
+    # Optional cycle fingerprint from the engine's own state (see cycles.py), so
+    # --detect-cycles need not build a whole image every generation.
+    fingerprint: Callable[[Any], tuple[bytes, tuple[int, int, int, int]]] | None = None
+
+    def from_grid(self, grid: list[list[bool]]) -> Any:
+        return self.from_cells(len(grid), len(grid[0]), cells_of(grid))
+
+    def as_array(self, state: Any) -> Any:
+        if self.to_array is not None:
+            return self.to_array(state)
+        import numpy as np
+
+        return np.asarray(self.to_grid(state), dtype=np.bool_)
+
+    def fingerprint_of(self, state: Any) -> tuple[bytes, tuple[int, int, int, int]]:
+        if self.fingerprint is not None:
+            return self.fingerprint(state)
+        from cycles import fingerprint
+
+        return fingerprint(self.as_array(state))
+
+
+DENSE = Engine(grid_from_cells, step, lambda grid: grid, population)
+
+# Engine name -> module implementing from_cells/step/to_grid/population. Imported lazily
+# so the dense engine works without the optional dependencies of the others.
+ENGINE_MODULES = {
+    "numpy": "vectorized",
+    "sparse": "sparse",
+    "bitboard": "bitboard",
+    "tiled": "tiled",
+    "active": "active",
+}
+
+
+# Engines whose step() takes a rule (see rules.py) and a wrap-around flag.
+RULE_ENGINES = {"numpy", "sparse"}
+
+
+def load_engine(name: str, rule: str | None = None, wrap: bool = False, **options: Any) -> Engine:
+    """Options (e.g. workers=4 for "tiled") are passed on to the engine's from_cells()."""
+    if (rule or wrap) and name not in RULE_ENGINES:
+        raise ValueError(f"--rule and --wrap need one of these engines: {', '.join(sorted(RULE_ENGINES))}")
+    if name == "dense":
+        return DENSE
+    module = importlib.import_module(ENGINE_MODULES[name])
+    step = module.step
+    if rule or wrap:
+        from rules import CONWAY, parse_rule
+
+        step = partial(module.step, rule=parse_rule(rule) if rule else CONWAY, wrap=wrap)
+    return Engine(
+        partial(module.from_cells, **options),
+        step,
+        module.to_grid,
+        module.population,
+        getattr(module, "to_array", None),
+        getattr(module, "stats", None),
+        getattr(module, "fingerprint", None),
+    )
 
-    if len(lines) != rows:
-        raise ValueError(f"Expected {rows} rows, got {len(lines)}")
 
-    for i, line in enumerate(lines, 1):
-        if len(line) != cols:
-            raise ValueError(f"Line {i}: expected {cols}, got {len(line)} — {repr(line)}")
+def load_cells(path: Path, name: str) -> tuple[int, int, list[tuple[int, int]]]:
+    return catalog.load_cells(path, name)
 
-    grid = [[(ch in "O1#") for ch in line] for line in lines]
 
-    return grid
+def load_grid(path: Path, name: str, engine: Engine = DENSE) -> Any:
+    return engine.from_cells(*load_cells(path, name))
 
 
 def available_patterns(toml_file: Path) -> list[str]:
-    with open(toml_file, "rb") as f:
-        data = tomllib.load(f)
+    return catalog.names(toml_file)
 
-    patterns = data["patterns"]
 
-    if not patterns:
-        return []
+def centred(rows: int, cols: int, cells: list[tuple[int, int]], size: tuple[int, int]):
+    """Place a pattern in the middle of a larger (or smaller, clipping it) board."""
+    new_rows, new_cols = size
+    dr = (new_rows - rows) // 2
+    dc = (new_cols - cols) // 2
+    moved = [(r + dr, c + dc) for r, c in cells if 0 <= r + dr < new_rows and 0 <= c + dc < new_cols]
+    return new_rows, new_cols, moved
 
-    return patterns.keys()
 
+def parse_size(text: str) -> tuple[int, int]:
+    rows, _, cols = text.lower().partition("x")
+    return int(rows), int(cols)
+
+
+def peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def benchmark(
+    state: Any,
+    engine: Engine,
+    rows: int,
+    cols: int,
+    generations: int,
+    detect_cycles: bool = False,
+    wrap: bool = False,
+) -> dict[str, Any]:
+    detector = None
+    if detect_cycles:
+        from cycles import CycleDetector
+
+        detector = CycleDetector()
+        detector.observe(0, *engine.fingerprint_of(state), engine.population(state))
+
+    stepped = 0
+    start = time.perf_counter()
+    while stepped < generations:
+        state = engine.step(state)
+        stepped += 1
+        if not detector:
+            continue
+        key, box = engine.fingerprint_of(state)
+        alive = engine.population(state)
+        cycle = detector.observe(stepped, key, box, alive)
+        if not cycle:
+            continue
+        if wrap or not (cycle.dr or cycle.dc) or detector.stays_inside(rows, cols, generations):
+            break
+        # A spaceship that reaches the edge of a clipped board changes there, so
+        # keep stepping and look for a cycle again from here.
+        detector = CycleDetector()
+        detector.observe(stepped, key, box, alive)
+    elapsed = time.perf_counter() - start
+    rate = stepped / elapsed if elapsed else float("inf")
+    report: dict[str, Any] = {
+        "rows": rows,
+        "cols": cols,
+        "generations": generations,
+        "generations_stepped": stepped,
+        "seconds": elapsed,
+        "generations_per_sec": rate,
+        "cells_per_sec": rate * rows * cols,
+        "population": engine.population(state),
+        "peak_rss_kb": peak_rss_kb(),
+        **(engine.stats(state) if engine.stats else {}),
+    }
+    if detector and detector.cycle:
+        cycle = detector.cycle
+        # Extrapolated: the board at `generations` repeats one already seen.
+        report["population"] = detector.population_at(generations)
+        report["cycle"] = {
+            "kind": cycle.kind,
+            "start": cycle.start,
+            "period": cycle.period,
+            "displacement": [cycle.dr, cycle.dc],
+        }
+    return report
+
+
+def main(state: Any, fps: int, engine: Engine = DENSE, ahead: int = 8, changed_only: bool = False):
+    # Imported here so headless runs never pay for (or need) a GUI backend.
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+    from pipeline import FramePipeline
+
+    # Generations are computed on a background thread, up to `ahead` frames ahead of
+    # the screen, so a slow step shows up as dropped frames rather than a slow timer.
+    pipeline = FramePipeline(state, engine, ahead, changed_only)
 
-def main(grid: list[list[bool]], fps: int):
     fig, ax = plt.subplots()
     ax.axis("off")  # type:ignore
 
-    img = ax.imshow(grid, cmap="Greys", interpolation="nearest")  # type:ignore
+    img = ax.imshow(pipeline.image, cmap="Greys", interpolation="nearest", vmin=0, vmax=1)  # type:ignore
+    status = ax.text(0.01, 0.99, "", transform=ax.transAxes, va="top", color="tab:red")  # type:ignore
 
     def update(_frame: None):
-        nonlocal grid
-        grid = step(grid)
-        img.set_data(grid)
-        return [img]
+        dropped = pipeline.dropped
+        changed = pipeline.next_frame()
+        if changed:
+            # matplotlib redraws an AxesImage whole, so --changed-only saves copying
+            # between the threads but not drawing.
+            img.set_data(pipeline.image)
+        status.set_text(f"gen {pipeline.generation}  dropped {pipeline.dropped}")
+        # With blitting, returning nothing skips the redraw when nothing changed.
+        return [img, status] if changed or pipeline.dropped != dropped else []
 
     interval = 1000 / fps
 
@@ -110,16 +273,89 @@ def main(grid: list[list[bool]], fps: int):
         plt.show()
     except KeyboardInterrupt:
         pass
+    finally:
+        pipeline.close()
+        print(f"{pipeline.generation} generations shown, {pipeline.dropped} frames dropped")
+
+
+def fast_forward(path: Path, name: str, generations: int):
+    import hashlife
+
+    universe = hashlife.from_cells(*load_cells(path, name))
+    universe = hashlife.advance(universe, generations)
+    print(f"generation {universe.generation}: population {hashlife.population(universe)}")
+    box = hashlife.bounding_box(universe)
+    if box is not None:
+        top, left, bottom, right = box
+        print(f"bounding box: rows {top}..{bottom}, cols {left}..{right} ({bottom - top + 1}x{right - left + 1})")
 
 
 if __name__ == "__main__":
     parser = ArgumentParser(description="Conway's Game of Life")
-    parser.add_argument("--patterns", type=Path, default="patterns.toml", help="Path to TOML file with [patterns]")
+    parser.add_argument(
+        "--patterns", type=Path, default="patterns.toml", help="Path to TOML file with [patterns], or an .rle file"
+    )
     parser.add_argument("--list", action="store_true", help="list all available patterns")
     parser.add_argument("--fps", type=int, default=5, help="animation speed in frames per second")
+    parser.add_argument("--engine", choices=["dense", *ENGINE_MODULES], default="dense", help="stepping engine to use")
+    parser.add_argument("--ahead", type=int, default=8, help="generations to compute ahead of the animation")
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="queue only the region that changed since the last frame (less copying; the image is still redrawn whole)",
+    )
+    parser.add_argument("--rule", help="life-like rule in B/S notation, e.g. B36/S23 (numpy and sparse engines)")
+    parser.add_argument("--wrap", action="store_true", help="wrap around the edges (numpy and sparse engines)")
+    parser.add_argument("--workers", type=int, help="processes for --engine tiled (default: one per core)")
+    parser.add_argument(
+        "--scaling", action="store_true", help="with --headless --engine tiled, benchmark 1..--workers processes"
+    )
+    parser.add_argument(
+        "--detect-cycles",
+        action="store_true",
+        help="with --headless, stop once the pattern repeats (still life, oscillator, spaceship) and extrapolate",
+    )
+    parser.add_argument(
+        "--record", type=Path, metavar="OUT", help="stream --generations steps to a delta-compressed recording file"
+    )
+    parser.add_argument(
+        "--video", type=Path, metavar="OUT.gif", help="with --record, also encode a .gif or .png (APNG)"
+    )
+    parser.add_argument("--replay", type=Path, metavar="FILE", help="animate a recording made with --record")
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        metavar="OUT.csv",
+        help="step every pattern in --patterns together for --generations and write populations as CSV",
+    )
+    parser.add_argument("--size", type=parse_size, metavar="ROWSxCOLS", help="centre the pattern on a board this big")
+    parser.add_argument(
+        "--headless", action="store_true", help="run --generations steps without a GUI and print timings as JSON"
+    )
+    jump = parser.add_mutually_exclusive_group()
+    jump.add_argument(
+        "--generations",
+        type=int,
+        help="with --headless, --record or --batch, steps to run; otherwise jump N generations ahead with HashLife",
+    )
+    jump.add_argument("--jump", type=int, metavar="K", help="like --generations, but 2**K generations")
     parser.add_argument("name", type=str, nargs="?", help="name of pattern to load: [patterns.name]")
 
     args = parser.parse_args()
+    if args.scaling and args.engine != "tiled":
+        parser.error("--scaling needs --engine tiled")
+    fast_forwarding = (args.generations is not None or args.jump is not None) and not (
+        args.headless or args.record or args.batch or args.replay or args.list
+    )
+    if fast_forwarding and (args.rule or args.wrap or args.engine != "dense" or args.size):
+        parser.error(
+            "the HashLife jump (--generations/--jump without --headless, --record or --batch) is B3/S23 on an "
+            "unbounded board and cannot take --rule, --wrap, --engine or --size"
+        )
+    if args.batch and (args.wrap or args.engine != "dense" or args.size):
+        parser.error("--batch steps every pattern on its own clipped board and cannot take --wrap, --engine or --size")
+    if (args.rule or args.wrap) and args.engine not in RULE_ENGINES and not args.batch:
+        parser.error(f"--rule and --wrap need one of these engines: {', '.join(sorted(RULE_ENGINES))}")
 
     if not args.patterns.is_file() or not os.access(args.patterns, os.R_OK):
         print(f"{args.patterns} does not exist or is not readable", sys.stderr)
@@ -127,10 +363,91 @@ if __name__ == "__main__":
 
     if args.list:
         print(f"Patterns available in {args.patterns}:")
+        for name, entry in catalog.load_index(args.patterns).items():
+            print(f"  - {name} ({entry.rows}x{entry.cols}, {entry.population} alive)")
+        sys.exit(0)
+
+    generations = args.generations if args.jump is None else 1 << args.jump
+
+    if args.replay:
+        from record import Recording
+
+        recording = Recording(args.replay)
+        last = len(recording) - 1
+        replay = Engine(
+            lambda *_: 0,
+            lambda generation: min(generation + 1, last),
+            lambda generation: recording.frame(generation).tolist(),
+            lambda generation: int(recording.frame(generation).sum()),
+            recording.frame,
+        )
+        main(0, args.fps, replay, args.ahead, args.changed_only)
+        sys.exit(0)
+
+    if args.batch:
+        import batch
+        from rules import CONWAY, parse_rule
+
+        names: list[str] = []
+        patterns: list[tuple[int, int, list[tuple[int, int]]]] = []
         for name in available_patterns(args.patterns):
-            print(f"  - {name}")
+            try:
+                patterns.append(load_cells(args.patterns, name))
+                names.append(name)
+            except ValueError as e:
+                print(f"skipping {name}: {e}", file=sys.stderr)
+        series = batch.populations(
+            patterns, 100 if generations is None else generations, parse_rule(args.rule) if args.rule else CONWAY
+        )
+        batch.write_csv(args.batch, names, series)
+        print(f"wrote {len(names)} patterns x {len(series)} generations to {args.batch}")
+        sys.exit(0)
+
+    if generations is not None and not (args.headless or args.record):
+        fast_forward(args.patterns, args.name, generations)
+        sys.exit(0)
+
+    rows, cols, cells = load_cells(args.patterns, args.name)
+    if args.size:
+        rows, cols, cells = centred(rows, cols, cells, args.size)
+
+    options: dict[str, Any] = {"workers": args.workers} if args.engine == "tiled" else {}
+    if args.rule or args.wrap:
+        options.update(rule=args.rule, wrap=args.wrap)
+
+    if args.record:
+        from record import Recorder, Recording, export_animation
+
+        engine = load_engine(args.engine, **options)
+        board = engine.from_cells(rows, cols, cells)
+        with Recorder(args.record, rows, cols) as recorder:
+            recorder.append(engine.as_array(board))
+            for _ in range(generations if generations is not None else 100):
+                board = engine.step(board)
+                recorder.append(engine.as_array(board))
+        print(f"recorded {len(recorder.offsets)} generations to {args.record} ({args.record.stat().st_size} bytes)")
+        if args.video:
+            export_animation(Recording(args.record), args.video, args.fps)
+            print(f"wrote {args.video}")
+        sys.exit(0)
+
+    if args.headless:
+        generations = generations if generations is not None else 100
+        if args.scaling:
+            max_workers = args.workers or os.cpu_count() or 1
+            runs = [{"workers": n} for n in range(1, max_workers + 1)]
+        else:
+            runs = [options]
+        results = []
+        for run in runs:
+            engine = load_engine(args.engine, **run)
+            board = engine.from_cells(rows, cols, cells)
+            stats = benchmark(board, engine, rows, cols, generations, args.detect_cycles, args.wrap)
+            results.append({"engine": args.engine, "pattern": args.name, **run, **stats})
+        print(json.dumps(results if args.scaling else results[0], indent=2))
         sys.exit(0)
 
-    grid = load_grid(args.patterns, args.name)
+    engine = load_engine(args.engine, **options)
+    board = engine.from_cells(rows, cols, cells)
 
-    main(grid, args.fps)
+    main(board, args.fps, engine, args.ahead, args.changed_only)
@@ -0,0 +1,87 @@
+"""
+Producer/consumer frame pipeline for the animation: a background thread steps
+the engine ahead into a bounded queue, and the matplotlib timer only copies the
+next ready frame onto the screen. A tick that finds no frame ready is counted
+as dropped instead of stalling the timer.
+
+With changed_only, a frame carries just the bounding box of the cells that
+changed, which cuts copying through the queue on big, quiet boards. The screen
+image is still redrawn in full each time it changes.
+"""
+
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Any, NamedTuple
+import numpy as np
+import numpy.typing as npt
+
+Image = npt.NDArray[np.uint8]
+
+
+class Frame(NamedTuple):
+    # Rows top:bottom and columns left:right of `cells` replace that region of the
+    # previous frame. A whole frame is the box covering the board.
+    top: int
+    bottom: int
+    left: int
+    right: int
+    cells: Image
+
+
+class FramePipeline:
+    def __init__(self, state: Any, engine: Any, ahead: int = 8, changed_only: bool = False):
+        self.engine = engine
+        self.changed_only = changed_only
+        self.image = self.to_image(state)
+        self.frames: Queue[Frame] = Queue(maxsize=max(ahead, 1))
+        self.generation = 0
+        self.dropped = 0
+        self.stopped = Event()
+        self.thread = Thread(target=self.produce, args=(state,), daemon=True)
+        self.thread.start()
+
+    def to_image(self, state: Any) -> Image:
+        return self.engine.as_array(state).astype(np.uint8)
+
+    def produce(self, state: Any):
+        previous = self.image
+        rows, cols = previous.shape
+        while not self.stopped.is_set():
+            state = self.engine.step(state)
+            image = self.to_image(state)
+            if self.changed_only:
+                diff = image != previous
+                changed_rows = np.flatnonzero(diff.any(axis=1))
+                if len(changed_rows):
+                    changed_cols = np.flatnonzero(diff.any(axis=0))
+                    top, bottom = int(changed_rows[0]), int(changed_rows[-1]) + 1
+                    left, right = int(changed_cols[0]), int(changed_cols[-1]) + 1
+                else:
+                    top = bottom = left = right = 0
+                frame = Frame(top, bottom, left, right, image[top:bottom, left:right])
+            else:
+                frame = Frame(0, rows, 0, cols, image)
+            previous = image
+            while not self.stopped.is_set():
+                try:
+                    self.frames.put(frame, timeout=0.1)
+                    break
+                except Full:
+                    continue
+
+    def next_frame(self) -> bool:
+        """Apply the next ready frame to self.image. False if nothing on screen changes."""
+        try:
+            frame = self.frames.get_nowait()
+        except Empty:
+            self.dropped += 1
+            return False
+        self.generation += 1
+        if frame.top == frame.bottom:
+            return False
+        self.image[frame.top : frame.bottom, frame.left : frame.right] = frame.cells
+        return True
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,143 @@
+"""
+Recorded runs: generations are streamed to disk as they are computed and can be
+replayed later with random access to any generation.
+
+File layout (little-endian):
+
+    header   magic "LIFEREC1", rows (u64), cols (u64), keyframe interval (u32)
+    frames   kind (1 byte: "K" or "D"), payload length (u64), payload
+    index    one u64 file offset per generation
+    footer   generation count (u64), index offset (u64), magic "LIFEEND1"
+
+A "K" keyframe is the whole board as packed bits. A "D" delta is the flat
+indices of the cells that flipped since the previous generation. A keyframe is
+written every `keyframe` generations, so reading any generation decodes one
+keyframe plus at most keyframe - 1 deltas. The reader memory-maps the file,
+so nothing is loaded until it is needed.
+"""
+
+from pathlib import Path
+from typing import Iterator
+import mmap
+import struct
+import numpy as np
+import numpy.typing as npt
+
+Image = npt.NDArray[np.bool_]
+
+MAGIC = b"LIFEREC1"
+END = b"LIFEEND1"
+HEADER = struct.Struct("<8sQQI")
+FRAME = struct.Struct("<cQ")
+FOOTER = struct.Struct("<QQ8s")
+KEYFRAME = 256
+
+
+def index_dtype(rows: int, cols: int) -> type[np.unsignedinteger]:
+    return np.uint32 if rows * cols <= 1 << 32 else np.uint64
+
+
+class Recorder:
+    """Appends generations to a recording; only the previous frame is kept in memory."""
+
+    def __init__(self, path: Path, rows: int, cols: int, keyframe: int = KEYFRAME):
+        self.file = open(path, "wb")
+        self.rows = rows
+        self.cols = cols
+        self.keyframe = keyframe
+        self.dtype = index_dtype(rows, cols)
+        self.offsets: list[int] = []
+        self.previous: Image | None = None
+        self.file.write(HEADER.pack(MAGIC, rows, cols, keyframe))
+
+    def append(self, image: Image):
+        image = np.asarray(image, dtype=np.bool_)
+        if len(self.offsets) % self.keyframe == 0 or self.previous is None:
+            kind, payload = b"K", np.packbits(image).tobytes()
+        else:
+            kind, payload = b"D", np.flatnonzero(image != self.previous).astype(self.dtype).tobytes()
+        self.offsets.append(self.file.tell())
+        self.file.write(FRAME.pack(kind, len(payload)))
+        self.file.write(payload)
+        self.previous = image.copy()
+
+    def close(self):
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.offsets, dtype=np.uint64).tobytes())
+        self.file.write(FOOTER.pack(len(self.offsets), index_offset, END))
+        self.file.close()
+
+    def __enter__(self) -> "Recorder":
+        return self
+
+    def __exit__(self, *_: object):
+        self.close()
+
+
+class Recording:
+    """Random-access reader over a memory-mapped recording."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.rows, self.cols, self.keyframe = HEADER.unpack_from(self.data)
+        count, index_offset, end = FOOTER.unpack_from(self.data, len(self.data) - FOOTER.size)
+        if magic != MAGIC or end != END:
+            raise ValueError(f"{path} is not a complete recording")
+        self.offsets = np.frombuffer(self.data, dtype=np.uint64, count=count, offset=index_offset)
+        self.dtype = index_dtype(self.rows, self.cols)
+        # The last decoded generation, so sequential playback only applies one delta.
+        self.cached: tuple[int, Image] | None = None
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def read(self, generation: int) -> tuple[bytes, memoryview]:
+        offset = int(self.offsets[generation])
+        kind, length = FRAME.unpack_from(self.data, offset)
+        start = offset + FRAME.size
+        return kind, memoryview(self.data)[start : start + length]
+
+    def frame(self, generation: int) -> Image:
+        if not 0 <= generation < len(self):
+            raise IndexError(f"generation {generation} not in recording of {len(self)}")
+        if self.cached and self.cached[0] <= generation and generation - self.cached[0] < self.keyframe:
+            current, image = self.cached[0], self.cached[1].copy()
+        else:
+            current = generation - generation % self.keyframe
+            _, payload = self.read(current)
+            bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=self.rows * self.cols)
+            image = bits.astype(np.bool_).reshape(self.rows, self.cols)
+        flat = image.reshape(-1)
+        for g in range(current + 1, generation + 1):
+            kind, payload = self.read(g)
+            if kind == b"K":
+                flat[:] = np.unpackbits(np.frombuffer(payload, dtype=np.uint8), count=flat.size).astype(np.bool_)
+            else:
+                flat[np.frombuffer(payload, dtype=self.dtype)] ^= True
+        self.cached = (generation, image)
+        return image.copy()
+
+    def frames(self) -> Iterator[Image]:
+        for generation in range(len(self)):
+            yield self.frame(generation)
+
+    def close(self):
+        self.offsets = np.empty(0, dtype=np.uint64)
+        self.data.close()
+
+
+def export_animation(recording: Recording, path: Path, fps: int = 10, scale: int = 4):
+    """Encode a recording as GIF, or APNG for a .png path, one frame at a time."""
+    from PIL import Image as PILImage
+
+    def images() -> Iterator[PILImage.Image]:
+        for frame in recording.frames():
+            pixels = np.where(frame, 0, 255).astype(np.uint8)
+            yield PILImage.fromarray(pixels).resize(
+                (recording.cols * scale, recording.rows * scale), PILImage.Resampling.NEAREST
+            )
+
+    frames = images()
+    first = next(frames)
+    first.save(path, save_all=True, append_images=frames, duration=1000 // fps, loop=0)
@@ -0,0 +1,41 @@
+"""
+Life-like rules in B/S notation ("B3/S23" is Conway's Life, "B36/S23" HighLife),
+compiled to a lookup table indexed by [alive][live neighbour count].
+"""
+
+from typing import NamedTuple
+
+
+class Rule(NamedTuple):
+    birth: frozenset[int]
+    survive: frozenset[int]
+
+    def __str__(self) -> str:
+        return "B" + "".join(map(str, sorted(self.birth))) + "/S" + "".join(map(str, sorted(self.survive)))
+
+    def table(self) -> list[list[bool]]:
+        """table[alive][n]: whether a cell with n live neighbours is alive next generation."""
+        return [[n in self.birth for n in range(9)], [n in self.survive for n in range(9)]]
+
+
+def digits(text: str, rule: str) -> frozenset[int]:
+    if not all(ch in "012345678" for ch in text):
+        raise ValueError(f"Invalid rule '{rule}': neighbour counts must be digits 0-8")
+    return frozenset(int(ch) for ch in text)
+
+
+def parse_rule(text: str) -> Rule:
+    """Parse "B3/S23" (in either order, any case) or the older "S/B" form "23/3"."""
+    parts = text.strip().upper().split("/")
+    if len(parts) != 2:
+        raise ValueError(f"Invalid rule '{text}': expected e.g. 'B3/S23'")
+    if all(part[:1] not in ("B", "S") for part in parts):
+        return Rule(digits(parts[1], text), digits(parts[0], text))
+    birth = next((part[1:] for part in parts if part.startswith("B")), None)
+    survive = next((part[1:] for part in parts if part.startswith("S")), None)
+    if birth is None or survive is None:
+        raise ValueError(f"Invalid rule '{text}': expected e.g. 'B3/S23'")
+    return Rule(digits(birth, text), digits(survive, text))
+
+
+CONWAY = parse_rule("B3/S23")
@@ -0,0 +1,76 @@
+from array import array
+from collections import Counter
+from hashlib import blake2b
+from typing import Any, Iterable, NamedTuple
+from rules import CONWAY, Rule
+
+OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)]
+
+
+class Board(NamedTuple):
+    """Only the live cells of a rows x cols universe; everything else is dead."""
+
+    rows: int
+    cols: int
+    cells: frozenset[tuple[int, int]]
+
+
+def from_cells(rows: int, cols: int, cells: Iterable[tuple[int, int]]) -> Board:
+    return Board(rows, cols, frozenset(cells))
+
+
+def to_grid(board: Board) -> list[list[bool]]:
+    grid = [[False] * board.cols for _ in range(board.rows)]
+    for r, c in board.cells:
+        grid[r][c] = True
+    return grid
+
+
+def to_array(board: Board) -> Any:
+    import numpy as np
+
+    image = np.zeros((board.rows, board.cols), dtype=np.bool_)
+    if board.cells:
+        image[tuple(zip(*board.cells))] = True
+    return image
+
+
+def population(board: Board) -> int:
+    return len(board.cells)
+
+
+def fingerprint(board: Board) -> tuple[bytes, tuple[int, int, int, int]]:
+    """Hash of the live cells relative to their bounding box, and the box (see cycles.py)."""
+    if not board.cells:
+        return b"", (0, 0, 0, 0)
+    rows, cols = zip(*board.cells)
+    top, left, bottom, right = min(rows), min(cols), max(rows) + 1, max(cols) + 1
+    width = right - left
+    offsets = sorted((r - top) * width + c - left for r, c in board.cells)
+    digest = blake2b(f"{bottom - top}x{width}".encode(), digest_size=16)
+    digest.update(array("Q", offsets).tobytes())
+    return digest.digest(), (top, left, bottom, right)
+
+
+def step(board: Board, rule: Rule = CONWAY, wrap: bool = False) -> Board:
+    # Only neighbours of live cells can be alive next generation (as long as the
+    # rule has no B0), so the work is proportional to the population rather than
+    # to rows * cols.
+    if 0 in rule.birth:
+        raise ValueError(f"The sparse engine cannot run {rule}: B0 rules bring empty space to life")
+    live = board.cells
+    rows, cols = board.rows, board.cols
+    if wrap:
+        counts = Counter(((r + dr) % rows, (c + dc) % cols) for r, c in live for dr, dc in OFFSETS)
+    else:
+        counts = Counter((r + dr, c + dc) for r, c in live for dr, dc in OFFSETS)
+    if 0 in rule.survive:
+        # An isolated live cell is nobody's neighbour, but S0 keeps it alive.
+        counts.update(dict.fromkeys(live, 0))
+    born, survives = rule.table()
+    cells = frozenset(
+        (r, c)
+        for (r, c), n in counts.items()
+        if (survives[n] if (r, c) in live else born[n]) and 0 <= r < rows and 0 <= c < cols
+    )
+    return Board(rows, cols, cells)
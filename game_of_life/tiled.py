@@ -0,0 +1,86 @@
+"""
+Multi-core stepping: the board is cut into horizontal bands and a process pool
+steps each band with the NumPy engine. Both generations live in shared memory,
+so per generation only (buffer, first row, last row) crosses the process boundary.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterable
+import os
+import weakref
+import numpy as np
+import vectorized
+from vectorized import Grid
+
+
+class Board:
+    def __init__(self, rows: int, cols: int, workers: int | None = None):
+        workers = workers or os.cpu_count() or 1
+        self.rows = rows
+        self.cols = cols
+        self.buffers = [SharedMemory(create=True, size=max(rows * cols, 1)) for _ in range(2)]
+        self.grids: list[Grid] = [np.ndarray((rows, cols), dtype=np.bool_, buffer=shm.buf) for shm in self.buffers]
+        self.current = 0
+        edges = [rows * i // workers for i in range(workers + 1)]
+        self.bands = [(lo, hi) for lo, hi in zip(edges, edges[1:]) if lo < hi]
+        names = [shm.name for shm in self.buffers]
+        self.pool = ProcessPoolExecutor(workers, initializer=attach, initargs=(names, rows, cols))
+        weakref.finalize(self, release, self.pool, self.buffers)
+
+    @property
+    def grid(self) -> Grid:
+        return self.grids[self.current]
+
+
+def release(pool: ProcessPoolExecutor, buffers: list[SharedMemory]):
+    pool.shutdown(cancel_futures=True)
+    for shm in buffers:
+        shm.unlink()
+
+
+# Per-worker views of the two shared generations, set up once by attach().
+_buffers: list[SharedMemory] = []
+_grids: list[Grid] = []
+
+
+def attach(names: list[str], rows: int, cols: int):
+    for name in names:
+        shm = SharedMemory(name=name, track=False)
+        _buffers.append(shm)
+        _grids.append(np.ndarray((rows, cols), dtype=np.bool_, buffer=shm.buf))
+
+
+def step_band(current: int, lo: int, hi: int):
+    src, dst = _grids[current], _grids[1 - current]
+    # One row of halo on each side is enough for one generation.
+    top = max(lo - 1, 0)
+    new = vectorized.step(src[top : hi + 1])
+    dst[lo:hi] = new[lo - top : hi - top]
+
+
+def from_cells(rows: int, cols: int, cells: Iterable[tuple[int, int]], workers: int | None = None) -> Board:
+    board = Board(rows, cols, workers)
+    board.grid[...] = vectorized.from_cells(rows, cols, cells)
+    return board
+
+
+def to_grid(board: Board) -> list[list[bool]]:
+    return board.grid.tolist()
+
+
+def to_array(board: Board) -> Grid:
+    # Copy: the shared buffer is overwritten two generations from now.
+    return board.grid.copy()
+
+
+def population(board: Board) -> int:
+    return int(np.count_nonzero(board.grid))
+
+
+def step(board: Board) -> Board:
+    lows, highs = zip(*board.bands)
+    # list() waits for every band (and re-raises worker errors) before the swap.
+    list(board.pool.map(step_band, [board.current] * len(lows), lows, highs))
+    board.current = 1 - board.current
+    return board
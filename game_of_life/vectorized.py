@@ -0,0 +1,52 @@
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+import numpy.typing as npt
+from rules import CONWAY, Rule
+
+Grid = npt.NDArray[np.bool_]
+
+OFFSETS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)]
+
+
+def from_cells(rows: int, cols: int, cells: Iterable[tuple[int, int]]) -> Grid:
+    grid = np.zeros((rows, cols), dtype=np.bool_)
+    coords = list(cells)
+    if coords:
+        grid[tuple(zip(*coords))] = True
+    return grid
+
+
+def to_grid(grid: Grid) -> list[list[bool]]:
+    return grid.tolist()
+
+
+def to_array(grid: Grid) -> Grid:
+    return grid
+
+
+def population(grid: Grid) -> int:
+    return int(np.count_nonzero(grid))
+
+
+def neighbor_counts(grid: Grid, wrap: bool = False) -> npt.NDArray[np.uint8]:
+    # Cells past the edge count as dead, matching neighbors() in main.py, unless
+    # the board wraps around into a torus.
+    rows, cols = grid.shape
+    padded = np.pad(grid.view(np.uint8), 1, mode="wrap" if wrap else "constant")
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dr, dc in OFFSETS:
+        counts += padded[1 + dr : 1 + dr + rows, 1 + dc : 1 + dc + cols]
+    return counts
+
+
+@lru_cache
+def lookup(rule: Rule) -> Grid:
+    return np.array(rule.table(), dtype=np.bool_)
+
+
+def step(grid: Grid, rule: Rule = CONWAY, wrap: bool = False) -> Grid:
+    counts = neighbor_counts(grid, wrap)
+    if rule == CONWAY:
+        return (counts == 3) | (grid & (counts == 2))
+    return lookup(rule)[grid.view(np.uint8), counts]
@@ -0,0 +1,45 @@
+"""
+Compares the memory used per food by a list of Food objects and by a FoodTable.
+
+Run from this directory: python benchmark_memory.py
+"""
+
+import tracemalloc
+from food_lookup import FOOD_DATA_FILE, parse_food, parse_food_file
+
+
+def measure(build) -> tuple[object, int]:
+    """
+    Measures the memory still allocated after calling build.
+
+    Args:
+        build: A function that builds the data to measure.
+    Returns:
+        tuple[object, int]: The data that was built, and its size in bytes.
+    """
+    tracemalloc.start()
+    data = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, size
+
+
+def parse_food_objects() -> list:
+    """
+    Parses the data file into one Food object per line, the way the loader used to.
+
+    Returns:
+        list: The parsed Food objects.
+    """
+    with open(FOOD_DATA_FILE) as file:
+        return [parse_food(line) for line in file]
+
+
+if __name__ == "__main__":
+    objects, objects_size = measure(parse_food_objects)
+    table, table_size = measure(parse_food_file)
+    _, lookup_size = measure(lambda: {food_id: row for row, food_id in enumerate(table.ids)})
+    rows = len(table.names)
+    print(f"{rows} foods")
+    print(f"list[Food]: {objects_size / rows:.0f} bytes per food")
+    print(f"FoodTable:  {table_size / rows:.0f} bytes per food, {lookup_size / rows:.0f} of them for the ID lookup")
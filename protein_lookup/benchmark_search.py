@@ -0,0 +1,40 @@
+"""
+Compares search latency of the trigram index (search_foods) against the linear
+scan (find_foods) over the full food_simple.tsv, and checks they agree.
+
+Run from this directory: python benchmark_search.py
+"""
+
+import time
+from food_lookup import FOOD_DATA, find_foods, search_foods
+
+QUERIES = ["milk", "chicken", "egg", "beef", "cheese", "apple", "rice", "xyz", "salad dressing", "a", "soup"]
+REPEATS = 50
+
+
+def time_queries(search, target) -> float:
+    """
+    Times every query in QUERIES, REPEATS times each.
+
+    Args:
+        search: The search function to time.
+        target: The list of foods or the index to pass to it.
+    Returns:
+        float: The mean latency per query, in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for query in QUERIES:
+            search(target, query)
+    return (time.perf_counter() - start) * 1000 / (REPEATS * len(QUERIES))
+
+
+if __name__ == "__main__":
+    FOODS, FOOD_INDEX = FOOD_DATA.foods, FOOD_DATA.index
+    for query in QUERIES:
+        assert search_foods(FOOD_INDEX, query) == find_foods(FOODS, query), query
+    linear = time_queries(find_foods, FOODS)
+    indexed = time_queries(search_foods, FOOD_INDEX)
+    print(f"{len(FOODS.names)} foods, {len(QUERIES)} queries x {REPEATS}")
+    print(f"linear scan:   {linear:.3f} ms/query")
+    print(f"trigram index: {indexed:.3f} ms/query ({linear / indexed:.1f}x faster)")
@@ -0,0 +1,36 @@
+"""
+Measures how long startup takes to load food_simple.tsv and build the search
+indexes and statistics, with and without the cache file.
+
+Run from this directory: python benchmark_startup.py
+"""
+
+import time
+from food_lookup import load_food_data
+
+REPEATS = 20
+
+
+def time_load(use_cache: bool) -> float:
+    """
+    Times load_food_data, REPEATS times.
+
+    Args:
+        use_cache (bool): Whether load_food_data may use the cache file.
+    Returns:
+        float: The mean load time, in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        load_food_data(use_cache)
+    return (time.perf_counter() - start) * 1000 / REPEATS
+
+
+if __name__ == "__main__":
+    cached, parsed = load_food_data(use_cache=True), load_food_data(use_cache=False)
+    assert cached.foods == parsed.foods and cached.index == parsed.index
+    assert cached.fuzzy == parsed.fuzzy and cached.stats == parsed.stats
+    built = time_load(use_cache=False)
+    loaded = time_load(use_cache=True)
+    print(f"parsing and indexing the TSV: {built:.1f} ms")
+    print(f"from the cache:               {loaded:.1f} ms ({built / loaded:.1f}x faster)")
@@ -0,0 +1,119 @@
+"""
+Compares category rollups and protein range queries answered from the
+precomputed FoodStats against looping over every food, and checks they agree.
+
+Run from this directory: python benchmark_stats.py
+"""
+
+import statistics
+import time
+from food_lookup import (
+    FOOD_DATA,
+    category_histogram,
+    category_summary,
+    count_bins,
+    food_rows,
+    foods_in_range,
+)
+
+CATEGORIES = ["Milk", "Chicken breast", "Egg omelet or scrambled egg", "Cereal", "Nothing like this"]
+RANGES = [(20.0, 30.0), (0.0, 1.0), (50.0, 100.0), (7.5, 7.5)]
+REPEATS = 200
+
+FOODS = FOOD_DATA.foods
+FOOD_STATS = FOOD_DATA.stats
+
+
+def naive_summary(category: str) -> tuple[int, float, float, list[int]] | None:
+    """
+    Summarizes one category by looping over every food.
+
+    Args:
+        category (str): The category to summarize.
+    Returns:
+        tuple[int, float, float, list[int]] | None: The count, mean and median
+            protein, and the protein histogram, or None if there is no such category.
+    """
+    proteins = [food.protein for food in food_rows(FOODS) if food.category == category]
+    if not proteins:
+        return None
+    return len(proteins), statistics.fmean(proteins), statistics.median(proteins), count_bins(proteins)
+
+
+def naive_range(low: float, high: float) -> list[int]:
+    """
+    Finds the foods with protein between low and high by looping over every food.
+
+    Args:
+        low (float): The least protein content to include.
+        high (float): The most protein content to include.
+    Returns:
+        list[int]: The IDs of the matching foods, in table order.
+    """
+    return [food.id for food in food_rows(FOODS) if low <= food.protein <= high]
+
+
+def indexed_summary(category: str) -> tuple[int, float, float, list[int]] | None:
+    """
+    Summarizes one category from FOOD_STATS, in the same shape as naive_summary.
+
+    Args:
+        category (str): The category to summarize.
+    Returns:
+        tuple[int, float, float, list[int]] | None: The count, mean and median
+            protein, and the protein histogram, or None if there is no such category.
+    """
+    summary = category_summary(FOOD_STATS, category)
+    if summary is None:
+        return None
+    return summary.count, summary.mean, summary.median, category_histogram(FOOD_STATS, category)
+
+
+def indexed_range(low: float, high: float) -> list[int]:
+    """
+    Finds the foods with protein between low and high from FOOD_STATS.
+
+    Args:
+        low (float): The least protein content to include.
+        high (float): The most protein content to include.
+    Returns:
+        list[int]: The IDs of the matching foods, in table order.
+    """
+    return [FOODS.ids[row] for row in sorted(foods_in_range(FOOD_STATS, low, high))]
+
+
+def time_calls(function, arguments: list[tuple]) -> float:
+    """
+    Times a function over every set of arguments, REPEATS times each.
+
+    Args:
+        function: The function to time.
+        arguments (list[tuple]): The arguments for each call.
+    Returns:
+        float: The mean latency per call, in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for args in arguments:
+            function(*args)
+    return (time.perf_counter() - start) * 1000 / (REPEATS * len(arguments))
+
+
+if __name__ == "__main__":
+    for category in CATEGORIES:
+        naive, indexed = naive_summary(category), indexed_summary(category)
+        assert (naive is None) == (indexed is None), category
+        if naive is not None:
+            assert naive[0] == indexed[0] and naive[3] == indexed[3], category
+            assert abs(naive[1] - indexed[1]) < 1e-9 and naive[2] == indexed[2], category
+    for low, high in RANGES:
+        assert naive_range(low, high) == indexed_range(low, high), (low, high)
+    categories = [(category,) for category in CATEGORIES]
+    print(f"{len(FOODS.names)} foods in {len(FOOD_STATS.spans)} categories")
+    for label, naive, indexed, arguments in [
+        ("category rollup", naive_summary, indexed_summary, categories),
+        ("protein range", naive_range, indexed_range, RANGES),
+    ]:
+        slow = time_calls(naive, arguments)
+        fast = time_calls(indexed, arguments)
+        print(f"{label}: loop {slow:.3f} ms, precomputed {fast:.4f} ms ({slow / fast:.0f}x faster)")
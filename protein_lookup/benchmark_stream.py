@@ -0,0 +1,113 @@
+"""
+Compares loading a large food file all at once against streaming it, by the
+peak memory and time needed to total the protein of every category. The large
+file is made by repeating food_simple.tsv with new IDs in a temporary folder.
+
+Run from this directory: python benchmark_stream.py
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from food_lookup import FOOD_DATA_FILE, food_chunks, parse_food, read_lines, stream_foods
+
+ROWS = 500_000
+
+
+def write_large_file(path: str, rows: int):
+    """
+    Writes a food file of the given size by repeating the lines of food_simple.tsv.
+
+    Args:
+        path (str): Where to write the file.
+        rows (int): How many foods to write.
+    """
+    lines = list(read_lines(FOOD_DATA_FILE))
+    with open(path, "w") as file:
+        for row in range(rows):
+            category, name, _, protein = lines[row % len(lines)].split("\t")[:4]
+            file.write(f"{category}\t{name}\t{row}\t{protein}\n")
+
+
+def totals_eager(path: str) -> dict[str, float]:
+    """
+    Totals the protein of each category after parsing the whole file into a list.
+
+    Args:
+        path (str): The food file to read.
+    Returns:
+        dict[str, float]: The total protein of each category.
+    """
+    with open(path) as file:
+        foods = [parse_food(line) for line in file]
+    totals: dict[str, float] = {}
+    for food in foods:
+        totals[food.category] = totals.get(food.category, 0.0) + food.protein
+    return totals
+
+
+def totals_streamed(path: str) -> dict[str, float]:
+    """
+    Totals the protein of each category while streaming the file one food at a time.
+
+    Args:
+        path (str): The food file to read.
+    Returns:
+        dict[str, float]: The total protein of each category.
+    """
+    totals: dict[str, float] = {}
+    for food in stream_foods(path):
+        totals[food.category] = totals.get(food.category, 0.0) + food.protein
+    return totals
+
+
+def totals_chunked(path: str) -> dict[str, float]:
+    """
+    Totals the protein of each category one table of foods at a time.
+
+    Args:
+        path (str): The food file to read.
+    Returns:
+        dict[str, float]: The total protein of each category.
+    """
+    totals: dict[str, float] = {}
+    for chunk in food_chunks(path):
+        for category, protein in zip(chunk.categories, chunk.proteins):
+            totals[category] = totals.get(category, 0.0) + protein
+    return totals
+
+
+def measure(job, path: str) -> tuple[dict[str, float], float, int]:
+    """
+    Runs a job, timing it and tracking the most memory it had allocated at once.
+
+    Args:
+        job: The function to run on the file.
+        path (str): The food file to pass to it.
+    Returns:
+        tuple[dict[str, float], float, int]: The job's result, its time in seconds
+            (measured without tracking memory), and its peak memory in bytes.
+    """
+    start = time.perf_counter()
+    result = job(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    job(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "foods.tsv")
+        write_large_file(path, ROWS)
+        print(f"{ROWS} foods, {os.path.getsize(path) / 2**20:.0f} MiB")
+        expected = None
+        for label, job in [("whole list", totals_eager), ("streamed", totals_streamed), ("chunked", totals_chunked)]:
+            result, elapsed, peak = measure(job, path)
+            expected = expected or result
+            assert result.keys() == expected.keys()
+            assert all(abs(result[key] - expected[key]) < 1e-6 for key in expected), label
+            print(f"{label:10}  {elapsed:.2f} s, peak {peak / 2**20:.1f} MiB")
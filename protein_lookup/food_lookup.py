@@ -1,9 +1,31 @@
-from dataclasses import dataclass
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+import heapq
+import math
+import os
+import pickle
+import re
+import sys
+import threading
+import time
 from drafter import *
 
 # The path to the food data file.
 FOOD_DATA_FILE = "food_simple.tsv"
 
+# How many characters the streaming loader reads from the data file at a time.
+READ_CHUNK_SIZE = 1 << 20
+
+# How many foods each table from food_chunks holds.
+FOODS_PER_CHUNK = 50_000
+
+# The path to the parsed and indexed copy of the food data file, and its format version.
+FOOD_CACHE_FILE = FOOD_DATA_FILE + ".cache"
+FOOD_CACHE_VERSION = 4
+
 
 @dataclass
 class State:
@@ -11,10 +33,12 @@ class State:
     Represents the state of the food lookup application.
 
     Attributes:
-        food_items (list[int]): A list of food item IDs that the user has selected.
+        food_items (dict[int, None]): The IDs of the foods the user has selected, used
+            as an ordered set: the keys give O(1) membership checks and keep the
+            order in which the foods were added.
     """
 
-    food_items: list[int]
+    food_items: dict[int, None]
 
 
 @dataclass
@@ -52,57 +76,614 @@ def parse_food(line: str) -> Food:
     return Food(category, name, food_id, protein)
 
 
-def load_foods() -> list[Food]:
+@dataclass(slots=True)
+class LazyFood:
+    """
+    A food item read by the streaming loader. The line is only split into its
+    fields; the ID and protein text are converted to numbers when they are read.
+
+    Attributes:
+        category (str): The category of the food item.
+        name (str): The name of the food item.
+        id_text (str): The unique identifier of the food item, as written in the file.
+        protein_text (str): The protein content in grams, as written in the file.
+    """
+
+    category: str
+    name: str
+    id_text: str
+    protein_text: str
+
+    @property
+    def id(self) -> int:
+        return int(self.id_text)
+
+    @property
+    def protein(self) -> float:
+        return float(self.protein_text)
+
+
+def read_lines(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yields the lines of a text file, reading it in large chunks so that neither the
+    whole file nor a list of its lines is ever held in memory.
+
+    Args:
+        path (str): The file to read.
+        chunk_size (int): How many characters to read at a time.
+    Returns:
+        Iterator[str]: Each non-empty line, without its line ending.
+    """
+    rest = ""
+    with open(path) as file:
+        while chunk := file.read(chunk_size):
+            lines = (rest + chunk).split("\n")
+            # The last piece may be the start of a line that continues in the next chunk.
+            rest = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield line
+    if rest.strip():
+        yield rest
+
+
+def stream_foods(path: str = FOOD_DATA_FILE) -> Iterator[LazyFood]:
+    """
+    Yields the food items of a data file one at a time, without loading the whole file.
+
+    Args:
+        path (str): The data file to read, food_simple.tsv by default.
+    Returns:
+        Iterator[LazyFood]: Each food item, in file order.
+    """
+    for line in read_lines(path):
+        category, name, id_text, protein_text = line.strip().split("\t")[:4]
+        yield LazyFood(category, name, id_text, protein_text)
+
+
+def food_chunks(path: str = FOOD_DATA_FILE, size: int = FOODS_PER_CHUNK) -> Iterator["FoodTable"]:
+    """
+    Yields the food items of a data file as a series of small tables, for bulk jobs
+    that only need to look at part of a large file at once.
+
+    Args:
+        path (str): The data file to read, food_simple.tsv by default.
+        size (int): The most foods in each table.
+    Returns:
+        Iterator[FoodTable]: Tables of consecutive foods, in file order.
+    """
+    chunk = make_food_table([], [], [], [])
+    for food in stream_foods(path):
+        add_food_row(chunk, food)
+        if len(chunk.names) == size:
+            yield chunk
+            chunk = make_food_table([], [], [], [])
+    if chunk.names:
+        yield chunk
+
+
+@dataclass
+class FoodTable:
+    """
+    Stores many food items column by column instead of as one object per food.
+    Numbers live in typed arrays (8 bytes each) and every category string is
+    interned, so a row costs little more than its name.
+
+    Attributes:
+        categories (list[str]): The category of each food, interned.
+        names (list[str]): The name of each food.
+        ids (array): The ID of each food, as an array('q').
+        proteins (array): The protein content of each food in grams, as an array('d').
+        positions (dict[int, int]): The row of each food, keyed by its ID.
+    """
+
+    categories: list[str]
+    names: list[str]
+    ids: array
+    proteins: array
+    positions: dict[int, int]
+
+
+def make_food_table(
+    categories: list[str], names: list[str], ids: Iterable[int], proteins: Iterable[float]
+) -> FoodTable:
+    """
+    Builds a FoodTable from its columns.
+
+    Args:
+        categories (list[str]): The category of each food.
+        names (list[str]): The name of each food.
+        ids (Iterable[int]): The ID of each food.
+        proteins (Iterable[float]): The protein content of each food.
+    Returns:
+        FoodTable: The table, with the ID lookup filled in.
+    """
+    id_column = array("q", ids)
+    positions = {food_id: row for row, food_id in enumerate(id_column)}
+    return FoodTable([sys.intern(c) for c in categories], names, id_column, array("d", proteins), positions)
+
+
+def add_food_row(table: FoodTable, food: Food | LazyFood):
+    """
+    Appends a food item to the end of a FoodTable.
+
+    Args:
+        table (FoodTable): The table to add to.
+        food (Food | LazyFood): The food item to add.
+    """
+    table.positions[food.id] = len(table.names)
+    table.categories.append(sys.intern(food.category))
+    table.names.append(food.name)
+    table.ids.append(food.id)
+    table.proteins.append(food.protein)
+
+
+def food_row(table: FoodTable, row: int) -> Food:
+    """
+    Returns a Food view of one row of a FoodTable. The Food is made on demand, so
+    only the rows that are actually shown ever exist as objects.
+
+    Args:
+        table (FoodTable): The table to read from.
+        row (int): The position of the food in the table.
+    Returns:
+        Food: The food item in that row.
+    """
+    return Food(table.categories[row], table.names[row], table.ids[row], table.proteins[row])
+
+
+def food_rows(table: FoodTable) -> list[Food]:
+    """
+    Returns a Food view of every row of a FoodTable.
+
+    Args:
+        table (FoodTable): The table to read from.
+    Returns:
+        list[Food]: Every food item in the table, in order.
+    """
+    return [food_row(table, row) for row in range(len(table.names))]
+
+
+def parse_food_file() -> FoodTable:
     """
-    Loads food items from the food_simple.tsv file.
+    Parses every line of the food_simple.tsv file, reading it in chunks so that
+    only the finished columns are kept.
 
     Returns:
-        list[Food]: A list of Food objects loaded from the file.
+        FoodTable: The food items loaded from the file.
     """
-    food_items = []
-    with open(FOOD_DATA_FILE) as file:
-        for line in file:
-            food_items.append(parse_food(line))
+    food_items = make_food_table([], [], [], [])
+    for line in read_lines(FOOD_DATA_FILE):
+        add_food_row(food_items, parse_food(line))
     return food_items
 
 
-# Load the food items once at the start of the program.
-FOODS = load_foods()
+def food_file_signature() -> tuple[int, int] | None:
+    """
+    Identifies the current version of the food data file by its modification time and size.
+
+    Returns:
+        tuple[int, int] | None: The file's mtime (in nanoseconds) and size, or None if
+            the file cannot be inspected (for example, when running in a browser).
+    """
+    try:
+        stat = os.stat(get_drafter_path(FOOD_DATA_FILE))
+    except (OSError, ValueError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# The length of the n-grams used by the search index.
+NGRAM_SIZE = 3
+
+
+@dataclass
+class SearchIndex:
+    """
+    A trigram inverted index over food names, for fast substring search.
+
+    Attributes:
+        foods (FoodTable): The indexed foods.
+        names (list[str]): The lowercased name of each food, by position.
+        postings (dict[str, list[int]]): For each trigram, the positions of the
+            foods whose lowercased name contains it, in increasing order.
+    """
+
+    foods: FoodTable
+    names: list[str]
+    postings: dict[str, list[int]]
+
+
+def ngrams(text: str) -> set[str]:
+    """
+    Returns every distinct NGRAM_SIZE-character substring of the given text.
+
+    Args:
+        text (str): The text to split.
+    Returns:
+        set[str]: The n-grams of the text (empty if it is shorter than NGRAM_SIZE).
+    """
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def build_search_index(foods: FoodTable) -> SearchIndex:
+    """
+    Builds a trigram index over the names of the given foods.
+
+    Args:
+        foods (FoodTable): The food items to index.
+    Returns:
+        SearchIndex: The index, ready for search_foods.
+    """
+    names = [name.lower() for name in foods.names]
+    postings: dict[str, list[int]] = {}
+    for position, name in enumerate(names):
+        for gram in ngrams(name):
+            postings.setdefault(gram, []).append(position)
+    return SearchIndex(foods, names, postings)
+
+
+def search_rows(index: SearchIndex, query: str) -> list[int]:
+    """
+    Finds the rows of the food items that match the given query, using the trigram
+    index. Only checks the foods that contain every trigram of the query.
+
+    Args:
+        index (SearchIndex): The index to search.
+        query (str): The search query string.
+    Returns:
+        list[int]: The positions of the matching foods, in increasing order.
+    """
+    query_lower = query.lower()
+    grams = ngrams(query_lower)
+    if grams:
+        # Start from the rarest trigram so the candidate set shrinks fastest.
+        lists = sorted((index.postings.get(gram, []) for gram in grams), key=len)
+        matches = set(lists[0])
+        for postings in lists[1:]:
+            matches.intersection_update(postings)
+        candidates = sorted(matches)
+    else:
+        # Too short to have a trigram; the lowercased names still save some work.
+        candidates = list(range(len(index.names)))
+    return [i for i in candidates if query_lower in index.names[i]]
 
 
-def find_foods(foods: list[Food], query: str) -> list[Food]:
+def search_foods(index: SearchIndex, query: str) -> list[Food]:
+    """
+    Finds food items that match the given query, using the trigram index.
+    Gives exactly the same results, in the same order, as find_foods.
+
+    Args:
+        index (SearchIndex): The index to search.
+        query (str): The search query string.
+    Returns:
+        list[Food]: A list of Food objects that match the query.
+    """
+    return [food_row(index.foods, row) for row in search_rows(index, query)]
+
+
+def match_rank(name: str, query: str) -> int:
+    """
+    Rates how well a query matches a food name: 0 if the name starts with the query,
+    1 if a later word starts with it, and 2 if it only appears inside a word.
+
+    Args:
+        name (str): The lowercased food name, which must contain the query.
+        query (str): The lowercased search query.
+    Returns:
+        int: The rank of the match; lower is better.
+    """
+    if name.startswith(query):
+        return 0
+    start = name.find(query)
+    while start != -1:
+        if not name[start - 1].isalnum():
+            return 1
+        start = name.find(query, start + 1)
+    return 2
+
+
+def rank_foods(index: SearchIndex, query: str, rows: list[int], count: int) -> list[int]:
+    """
+    Picks the best `count` matching rows: prefix matches first, then word matches,
+    then other substring matches, with higher-protein foods first within each group.
+    Uses a heap, so only `count` rows are ever fully ordered.
+
+    Args:
+        index (SearchIndex): The index the rows came from.
+        query (str): The search query string.
+        rows (list[int]): The matching rows, from search_rows.
+        count (int): How many rows to return.
+    Returns:
+        list[int]: The best rows, best first.
+    """
+    query_lower = query.lower()
+    proteins = index.foods.proteins
+    return heapq.nsmallest(
+        count, rows, key=lambda row: (match_rank(index.names[row], query_lower), -proteins[row], row)
+    )
+
+
+# The most typos a single query word may contain and still match.
+MAX_TYPOS = 2
+
+
+@dataclass
+class FuzzyIndex:
+    """
+    A SymSpell-style deletion index over the words of the food names, for searches
+    that tolerate typos. Every word is stored under each string that can be made by
+    deleting up to MAX_TYPOS of its letters, so the words close to a misspelling are
+    found by looking up the misspelling's own deletions.
+
+    Attributes:
+        foods (FoodTable): The indexed foods.
+        deletions (dict[str, list[str]]): For each deletion, the words it came from.
+        postings (dict[str, list[int]]): For each word, the positions of the foods
+            whose name contains it, in increasing order.
+    """
+
+    foods: FoodTable
+    deletions: dict[str, list[str]]
+    postings: dict[str, list[int]]
+
+
+def words(text: str) -> list[str]:
+    """
+    Splits the given text into lowercase words of letters and digits.
+
+    Args:
+        text (str): The text to split.
+    Returns:
+        list[str]: The words of the text, in order.
+    """
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def allowed_typos(word: str) -> int:
+    """
+    Returns how many typos a query word may contain. Short words get fewer, since
+    almost any short word is within two typos of another.
+
+    Args:
+        word (str): The query word.
+    Returns:
+        int: The number of typos allowed, at most MAX_TYPOS.
+    """
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return min(1, MAX_TYPOS)
+    return MAX_TYPOS
+
+
+def deletions(word: str, limit: int) -> set[str]:
+    """
+    Returns the word along with every string made by deleting up to `limit` of its letters.
+
+    Args:
+        word (str): The word to delete letters from.
+        limit (int): The most letters to delete.
+    Returns:
+        set[str]: The distinct deletions, including the word itself.
+    """
+    found = {word}
+    frontier = {word}
+    for _ in range(limit):
+        frontier = {text[:i] + text[i + 1 :] for text in frontier for i in range(len(text))}
+        found |= frontier
+    return found
+
+
+def typo_distance(a: str, b: str) -> int:
+    """
+    Counts the typos between two words: letters inserted, deleted or changed, and
+    neighbouring letters swapped (the optimal string alignment distance).
+
+    Args:
+        a (str): The first word.
+        b (str): The second word.
+    Returns:
+        int: The number of typos that turn one word into the other.
+    """
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if before is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        before, previous = previous, current
+    return previous[len(b)]
+
+
+def build_fuzzy_index(foods: FoodTable) -> FuzzyIndex:
+    """
+    Builds a deletion index over the words in the names of the given foods.
+
+    Args:
+        foods (FoodTable): The food items to index.
+    Returns:
+        FuzzyIndex: The index, ready for fuzzy_rows.
+    """
+    postings: dict[str, list[int]] = {}
+    for position, name in enumerate(foods.names):
+        for word in dict.fromkeys(words(name)):
+            postings.setdefault(word, []).append(position)
+    index: dict[str, list[str]] = {}
+    for word in postings:
+        for deletion in deletions(word, MAX_TYPOS):
+            index.setdefault(deletion, []).append(word)
+    return FuzzyIndex(foods, index, postings)
+
+
+def similar_words(index: FuzzyIndex, word: str) -> dict[str, int]:
+    """
+    Finds the indexed words within the allowed number of typos of a query word.
+
+    Args:
+        index (FuzzyIndex): The index to search.
+        word (str): The lowercased query word.
+    Returns:
+        dict[str, int]: Each close indexed word and its number of typos.
+    """
+    limit = allowed_typos(word)
+    found: dict[str, int] = {}
+    for deletion in deletions(word, limit):
+        for candidate in index.deletions.get(deletion, ()):
+            if candidate not in found:
+                found[candidate] = typo_distance(word, candidate)
+    return {candidate: typos for candidate, typos in found.items() if typos <= limit}
+
+
+def fuzzy_rows(index: FuzzyIndex, query: str) -> list[int]:
+    """
+    Finds the foods whose name has a close match for every word of the query, for
+    when a search finds nothing. Foods needing fewer typos come first, then
+    higher-protein foods.
+
+    Args:
+        index (FuzzyIndex): The index to search.
+        query (str): The search query string.
+    Returns:
+        list[int]: The positions of the matching foods, best first.
+    """
+    typos: dict[int, int] | None = None
+    for word in words(query):
+        best: dict[int, int] = {}
+        for candidate, distance in similar_words(index, word).items():
+            for row in index.postings[candidate]:
+                if distance < best.get(row, MAX_TYPOS + 1):
+                    best[row] = distance
+        if typos is None:
+            typos = best
+        else:
+            typos = {row: typos[row] + distance for row, distance in best.items() if row in typos}
+        if not typos:
+            return []
+    if typos is None:
+        return []
+    proteins = index.foods.proteins
+    return sorted(typos, key=lambda row: (typos[row], -proteins[row], row))
+
+
+# How many search results are shown on each page.
+RESULTS_PER_PAGE = 25
+
+# What the main page's search box can search by.
+SEARCH_MODES = ["name", "protein at least", "category"]
+
+# How many queries' results the search cache keeps.
+SEARCH_CACHE_SIZE = 256
+
+
+@dataclass
+class SearchCache:
+    """
+    A bounded least-recently-used cache of search results, keyed on the lowercased
+    query. The results belong to one FoodTable, and are dropped when the indexes
+    are rebuilt over a different one.
+
+    Attributes:
+        foods (FoodTable | None): The foods the cached results refer to.
+        capacity (int): The most queries to keep results for.
+        results (OrderedDict[str, tuple[list[int], bool]]): For each query, the
+            matching rows and whether they came from the fuzzy search, least
+            recently used first.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that had to search.
+        evictions (int): Results dropped to make room for newer ones.
+        invalidations (int): Times the whole cache was dropped for new foods.
+    """
+
+    foods: FoodTable | None = None
+    capacity: int = SEARCH_CACHE_SIZE
+    results: OrderedDict[str, tuple[list[int], bool]] = field(default_factory=OrderedDict)
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+def cached_search(cache: SearchCache, index: SearchIndex, fuzzy: FuzzyIndex, query: str) -> tuple[list[int], bool]:
+    """
+    Finds the rows matching the given query, like search_rows, falling back to
+    fuzzy_rows when nothing matches. Remembers the results of recent queries.
+
+    Args:
+        cache (SearchCache): The cache to answer from and update.
+        index (SearchIndex): The index for exact search.
+        fuzzy (FuzzyIndex): The index for typo-tolerant search, over the same foods.
+        query (str): The search query string.
+    Returns:
+        tuple[list[int], bool]: The matching rows, and whether they are fuzzy matches,
+            in which case they are already ranked. The list is shared with the cache
+            and must not be changed.
+    """
+    if cache.foods is not index.foods:
+        if cache.foods is not None:
+            cache.invalidations += 1
+        cache.results.clear()
+        cache.foods = index.foods
+    key = query.lower()
+    if key in cache.results:
+        cache.hits += 1
+        cache.results.move_to_end(key)
+        return cache.results[key]
+    cache.misses += 1
+    rows = search_rows(index, key)
+    result = (rows, False) if rows else (fuzzy_rows(fuzzy, key), True)
+    cache.results[key] = result
+    if len(cache.results) > cache.capacity:
+        cache.results.popitem(last=False)
+        cache.evictions += 1
+    return result
+
+
+# Results of recent searches, shared by every visitor.
+SEARCH_CACHE = SearchCache()
+
+
+def find_foods(foods: FoodTable, query: str) -> list[Food]:
     """
     Finds food items that match the given query. Ignores capitalization.
     As long as the query is a substring of the food name, it is considered a match.
 
     Args:
-        foods (list[Food]): A list of Food objects to search.
+        foods (FoodTable): The food items to search.
         query (str): The search query string.
     Returns:
         list[Food]: A list of Food objects that match the query.
     """
     results = []
     query_lower = query.lower()
-    for food in foods:
-        if query_lower in food.name.lower():
-            results.append(food)
+    for row, name in enumerate(foods.names):
+        if query_lower in name.lower():
+            results.append(food_row(foods, row))
     return results
 
 
-def get_food(foods: list[Food], food_ids: list[int]) -> list[Food]:
+def get_food(foods: FoodTable, food_ids: Iterable[int]) -> list[Food]:
     """
-    Retrieves food items that match the given list of food IDs.
+    Retrieves food items that match the given food IDs, in the order the IDs are given.
+    Each ID is looked up directly, so this does not depend on how many foods there are.
 
     Args:
-        foods (list[Food]): A list of Food objects to search.
-        food_ids (list[int]): A list of food IDs to look for.
+        foods (FoodTable): The food items to search.
+        food_ids (Iterable[int]): The food IDs to look for.
     Returns:
         list[Food]: A list of Food objects that match the given food IDs.
     """
     selected_foods = []
-    for food in foods:
-        if food.id in food_ids:
-            selected_foods.append(food)
+    for food_id in food_ids:
+        if food_id in foods.positions:
+            selected_foods.append(food_row(foods, foods.positions[food_id]))
     return selected_foods
 
 
@@ -110,45 +691,528 @@ def get_food(foods: list[Food], food_ids: list[int]) -> list[Food]:
 def index(state: State):
     """
     The main page of the food lookup application, where users can search for foods
-    and see their protein content. Also lists the foods the user has selected, and
-    shows the total protein content of those foods.
+    and see their protein content. Also lists the foods the user has selected, shows
+    the total protein content of those foods, and suggests higher-protein foods from
+    the same categories.
 
     Args:
         state (State): The current state of the application.
     Returns:
         Page: The main page of the application.
     """
-    selected_foods = get_food(FOODS, state.food_items)
+    data = FOOD_DATA
+    selected_foods = get_food(data.foods, state.food_items)
     total_protein_value = total_protein(selected_foods)
+    # Never suggest a food that is already selected, or the same food twice.
+    skip = {data.foods.positions[food.id] for food in selected_foods}
+    suggestions = []
+    for food in selected_foods:
+        for row in substitutes(data.stats, food, SUBSTITUTES_PER_FOOD, skip):
+            skip.add(row)
+            better = food_row(data.foods, row)
+            suggestions.append(f"Instead of {food.name}: {better.name} ({better.protein}g protein)")
+    swaps = ["Higher-protein swaps:", BulletedList(suggestions)] if suggestions else []
+    # Every button on a page submits every field on it, so the page has one search
+    # box and the search route decides what kind of search it is.
     return Page(
         state,
         [
             Header("Food Lookup"),
-            "Find foods by name and see their protein content.",
+            "Find foods by name, by protein content (leave blank for the highest), or by category.",
             TextBox("query"),
+            SelectBox("search_by", SEARCH_MODES, SEARCH_MODES[0]),
             Button("Search", "search"),
             Table(selected_foods),
             "Total protein:",
             str(total_protein_value),
+            *swaps,
         ],
     )
 
 
-def total_protein(foods: list[Food]) -> float:
+def total_protein(foods: list[Food] | FoodTable) -> float:
     """
-    Calculates the total protein content of a list of food items.
+    Calculates the total protein content of a list of food items, or of a whole table.
 
     Args:
-        foods (list[Food]): A list of Food objects.
+        foods (list[Food] | FoodTable): A list of Food objects, or a FoodTable.
     Returns:
         float: The total protein content of the food items.
     """
+    if isinstance(foods, FoodTable):
+        return sum(foods.proteins, 0.0)
     total = 0.0
     for food in foods:
         total += food.protein
     return total
 
 
+# The width of each bin of the protein histograms, in grams.
+HISTOGRAM_WIDTH = 5.0
+
+
+@dataclass
+class FoodStats:
+    """
+    Precomputed groupings of a FoodTable for protein statistics. Each category's
+    foods are stored next to each other, highest protein first, so a category's
+    rollup only reads its own slice. Every food is also kept in protein order, so
+    a protein range is found by binary search.
+
+    Attributes:
+        foods (FoodTable): The foods the statistics describe.
+        by_category (array): Every row, grouped by category and highest protein
+            first within a category, as an array('q').
+        spans (dict[str, tuple[int, int]]): For each category, the start and end
+            of its rows in by_category.
+        totals (dict[str, float]): The total protein of each category.
+        by_protein (array): Every row, lowest protein first, as an array('q').
+        sorted_proteins (array): The protein content of the rows in by_protein,
+            as an array('d').
+        category_names (dict[str, str]): A category's name, keyed by its lowercased
+            name, so categories can be looked up ignoring case.
+    """
+
+    foods: FoodTable
+    by_category: array
+    spans: dict[str, tuple[int, int]]
+    totals: dict[str, float]
+    by_protein: array
+    sorted_proteins: array
+    category_names: dict[str, str]
+
+
+@dataclass
+class CategorySummary:
+    """
+    The protein statistics of one category.
+
+    Attributes:
+        category (str): The category.
+        count (int): How many foods are in it.
+        mean (float): Their mean protein content in grams.
+        median (float): Their median protein content in grams.
+        top (list[Food]): The highest-protein foods, highest first.
+    """
+
+    category: str
+    count: int
+    mean: float
+    median: float
+    top: list[Food]
+
+
+def histogram_bin(protein: float) -> int:
+    """
+    Returns the histogram bin that a protein content falls in.
+
+    Args:
+        protein (float): The protein content in grams.
+    Returns:
+        int: The bin index, counting from 0 for the lowest bin.
+    """
+    return max(int(protein // HISTOGRAM_WIDTH), 0)
+
+
+def count_bins(proteins: Iterable[float]) -> list[int]:
+    """
+    Counts how many of the given protein contents fall in each histogram bin.
+
+    Args:
+        proteins (Iterable[float]): The protein contents in grams.
+    Returns:
+        list[int]: The count for each bin, up to the highest non-empty bin.
+    """
+    counts: list[int] = []
+    for protein in proteins:
+        slot = histogram_bin(protein)
+        if slot >= len(counts):
+            counts.extend([0] * (slot + 1 - len(counts)))
+        counts[slot] += 1
+    return counts
+
+
+def build_food_stats(foods: FoodTable) -> FoodStats:
+    """
+    Groups and sorts the given foods for protein statistics.
+
+    Args:
+        foods (FoodTable): The food items to summarize.
+    Returns:
+        FoodStats: The precomputed statistics.
+    """
+    proteins = foods.proteins
+    rows = sorted(range(len(foods.names)), key=lambda row: (foods.categories[row], -proteins[row], row))
+    spans: dict[str, tuple[int, int]] = {}
+    totals: dict[str, float] = {}
+    for position, row in enumerate(rows):
+        category = foods.categories[row]
+        start, _ = spans.get(category, (position, position))
+        spans[category] = (start, position + 1)
+        totals[category] = totals.get(category, 0.0) + proteins[row]
+    by_protein = array("q", sorted(range(len(foods.names)), key=lambda row: (proteins[row], row)))
+    sorted_proteins = array("d", (proteins[row] for row in by_protein))
+    category_names = {category.lower(): category for category in spans}
+    return FoodStats(foods, array("q", rows), spans, totals, by_protein, sorted_proteins, category_names)
+
+
+def find_category(stats: FoodStats, text: str) -> str | None:
+    """
+    Finds the category with the given name, ignoring surrounding spaces and, when
+    nothing matches exactly, case.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        text (str): The category name to look for.
+    Returns:
+        str | None: The category's name as written in the data, or None if there
+            is no such category.
+    """
+    text = text.strip()
+    # A few categories differ only in case, so an exact name picks its own.
+    if text in stats.spans:
+        return text
+    return stats.category_names.get(text.lower())
+
+
+def category_summary(stats: FoodStats, category: str, top: int = 5) -> CategorySummary | None:
+    """
+    Summarizes the protein content of one category.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        category (str): The category to summarize.
+        top (int): How many of the highest-protein foods to include.
+    Returns:
+        CategorySummary | None: The summary, or None if there is no such category.
+    """
+    if category not in stats.spans:
+        return None
+    start, end = stats.spans[category]
+    count = end - start
+    proteins = stats.foods.proteins
+    rows = stats.by_category
+    # The rows are highest protein first, so the median is in the middle.
+    middle = start + count // 2
+    if count % 2:
+        median = proteins[rows[middle]]
+    else:
+        median = (proteins[rows[middle - 1]] + proteins[rows[middle]]) / 2
+    best = [food_row(stats.foods, row) for row in rows[start : min(start + top, end)]]
+    return CategorySummary(category, count, stats.totals[category] / count, median, best)
+
+
+def category_histogram(stats: FoodStats, category: str) -> list[int]:
+    """
+    Counts the foods of one category in each HISTOGRAM_WIDTH bin of protein.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        category (str): The category to count.
+    Returns:
+        list[int]: The count for each bin, or an empty list if there is no such category.
+    """
+    start, end = stats.spans.get(category, (0, 0))
+    proteins = stats.foods.proteins
+    return count_bins(proteins[row] for row in stats.by_category[start:end])
+
+
+def histogram_lines(counts: list[int]) -> list[str]:
+    """
+    Describes a protein histogram one bin per line, for display.
+
+    Args:
+        counts (list[int]): The count for each HISTOGRAM_WIDTH bin, from count_bins.
+    Returns:
+        list[str]: A line such as "5-10g: 3 foods" for each bin.
+    """
+    lines = []
+    for slot, count in enumerate(counts):
+        low = slot * HISTOGRAM_WIDTH
+        lines.append(f"{low:g}-{low + HISTOGRAM_WIDTH:g}g: {count} foods")
+    return lines
+
+
+def foods_in_range(stats: FoodStats, low: float, high: float) -> list[int]:
+    """
+    Finds the foods whose protein content is between low and high grams, inclusive.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        low (float): The least protein content to include.
+        high (float): The most protein content to include.
+    Returns:
+        list[int]: The positions of the matching foods, lowest protein first.
+    """
+    start = bisect_left(stats.sorted_proteins, low)
+    end = bisect_right(stats.sorted_proteins, high)
+    return stats.by_protein[start:end].tolist()
+
+
+def highest_protein(stats: FoodStats, start: int, count: int) -> list[int]:
+    """
+    Returns a run of foods from the list of all foods, highest protein first.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        start (int): How many of the highest-protein foods to skip.
+        count (int): How many foods to return.
+    Returns:
+        list[int]: The positions of the foods, highest protein first.
+    """
+    end = len(stats.by_protein) - start
+    return stats.by_protein[max(end - count, 0) : max(end, 0)][::-1].tolist()
+
+
+def count_at_least(stats: FoodStats, minimum: float) -> int:
+    """
+    Counts the foods with at least the given protein content.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        minimum (float): The least protein content in grams.
+    Returns:
+        int: How many foods have that much protein or more.
+    """
+    return len(stats.sorted_proteins) - bisect_left(stats.sorted_proteins, minimum)
+
+
+def substitutes(stats: FoodStats, food: Food, count: int, skip: set[int]) -> list[int]:
+    """
+    Suggests foods from the same category with more protein than the given food.
+
+    Args:
+        stats (FoodStats): The precomputed statistics.
+        food (Food): The food to replace.
+        count (int): The most suggestions to return.
+        skip (set[int]): The positions of foods not to suggest, such as ones
+            already selected or already suggested.
+    Returns:
+        list[int]: The positions of the suggested foods, highest protein first.
+    """
+    start, end = stats.spans.get(food.category, (0, 0))
+    proteins = stats.foods.proteins
+    # The category is highest protein first, so everything before this has more.
+    better = bisect_left(stats.by_category, -food.protein, start, end, key=lambda row: -proteins[row])
+    found = []
+    for position in range(start, better):
+        if len(found) == count:
+            break
+        row = stats.by_category[position]
+        if row not in skip:
+            found.append(row)
+    return found
+
+
+# How many higher-protein swaps the main page suggests for each selected food.
+SUBSTITUTES_PER_FOOD = 1
+
+
+@dataclass(frozen=True)
+class FoodData:
+    """
+    One version of the food data, with the indexes and statistics built from it.
+    Nothing in it is changed once it is made: a reload builds a whole new FoodData
+    and swaps it in, so a request that took the current one at its start keeps a
+    consistent view even if a reload finishes while it runs.
+
+    Attributes:
+        foods (FoodTable): The food items.
+        index (SearchIndex): The trigram index over their names.
+        fuzzy (FuzzyIndex): The typo-tolerant index, used when a search finds nothing.
+        stats (FoodStats): The precomputed protein statistics.
+        signature (tuple[int, int] | None): The data file's mtime and size before it
+            was read, or None if the file cannot be inspected.
+        load_ms (float): How long loading and indexing took, in milliseconds.
+    """
+
+    foods: FoodTable
+    index: SearchIndex
+    fuzzy: FuzzyIndex
+    stats: FoodStats
+    signature: tuple[int, int] | None
+    load_ms: float
+
+
+def read_food_cache(signature: tuple[int, int]) -> tuple[FoodTable, SearchIndex, FuzzyIndex, FoodStats] | None:
+    """
+    Reads the parsed foods and their indexes and statistics from the cache file, if
+    it was made from the current data file.
+
+    Args:
+        signature (tuple[int, int]): The data file's current mtime and size.
+    Returns:
+        tuple[FoodTable, SearchIndex, FuzzyIndex, FoodStats] | None: The cached foods,
+            search index, fuzzy index and statistics, or None if the cache is missing,
+            stale or not in the expected shape.
+    """
+    try:
+        with open(FOOD_CACHE_FILE, "rb") as file:
+            cache = pickle.load(file)
+        if not isinstance(cache, dict):
+            return None
+        if cache.get("version") != FOOD_CACHE_VERSION or cache.get("signature") != signature:
+            return None
+        # Stored as plain columns and dicts rather than the classes themselves, so the
+        # number arrays unpickle as raw bytes and every part shares the one table.
+        foods = make_food_table(*cache["columns"])
+        return (
+            foods,
+            SearchIndex(foods, *cache["index"]),
+            FuzzyIndex(foods, *cache["fuzzy"]),
+            FoodStats(foods, *cache["stats"]),
+        )
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, KeyError, TypeError, ValueError):
+        # Unpickling a damaged or foreign file can raise almost anything; parse instead.
+        return None
+
+
+def write_food_cache(
+    foods: FoodTable, index: SearchIndex, fuzzy: FuzzyIndex, stats: FoodStats, signature: tuple[int, int]
+):
+    """
+    Saves the parsed foods and everything built from them to the cache file, so the
+    next start can skip both parsing and indexing.
+
+    Args:
+        foods (FoodTable): The foods parsed from the data file.
+        index (SearchIndex): The trigram index over their names.
+        fuzzy (FuzzyIndex): The typo-tolerant index over their names.
+        stats (FoodStats): Their protein statistics.
+        signature (tuple[int, int]): The data file's mtime and size when it was parsed.
+    """
+    cache = {
+        "version": FOOD_CACHE_VERSION,
+        "signature": signature,
+        "columns": (foods.categories, foods.names, foods.ids, foods.proteins),
+        "index": (index.names, index.postings),
+        "fuzzy": (fuzzy.deletions, fuzzy.postings),
+        "stats": (
+            stats.by_category,
+            stats.spans,
+            stats.totals,
+            stats.by_protein,
+            stats.sorted_proteins,
+            stats.category_names,
+        ),
+    }
+    try:
+        with open(FOOD_CACHE_FILE, "wb") as file:
+            pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # A read-only folder still works; it just parses the file every time.
+
+
+def load_food_data(use_cache: bool = True) -> FoodData:
+    """
+    Loads the food items and builds the indexes and statistics over them. Uses the
+    cache file when it was made from the current version of the data file, and
+    refreshes it otherwise.
+
+    Args:
+        use_cache (bool): Whether to read and write the cache file.
+    Returns:
+        FoodData: The loaded data, ready to be used by the routes.
+    """
+    start = time.perf_counter()
+    # Taken before reading, so a change made during the load is picked up next time.
+    signature = food_file_signature()
+    cached = read_food_cache(signature) if use_cache and signature is not None else None
+    if cached is not None:
+        foods, index, fuzzy, stats = cached
+    else:
+        foods = parse_food_file()
+        index = build_search_index(foods)
+        fuzzy = build_fuzzy_index(foods)
+        stats = build_food_stats(foods)
+        if use_cache and signature is not None:
+            write_food_cache(foods, index, fuzzy, stats, signature)
+    return FoodData(foods, index, fuzzy, stats, signature, (time.perf_counter() - start) * 1000)
+
+
+# Load the food items once at the start of the program. Routes read FOOD_DATA once
+# per request, and reload_food_data replaces it when the data file changes.
+FOOD_DATA = load_food_data()
+
+# How often the file watcher checks the data file for changes, in seconds.
+WATCH_INTERVAL = 1.0
+
+
+@dataclass
+class ReloadStats:
+    """
+    Counts the reloads of the food data, for the diagnostics page.
+
+    Attributes:
+        reloads (int): Times new data was swapped in.
+        failures (int): Times the changed file could not be loaded, for example
+            because it was still being written.
+        last_swap_us (float | None): How long the last swap took, in microseconds.
+        failed_signature (tuple[int, int] | None): The mtime and size of the file
+            that last failed to load, so it is not retried until it changes again.
+    """
+
+    reloads: int = 0
+    failures: int = 0
+    last_swap_us: float | None = None
+    failed_signature: tuple[int, int] | None = None
+
+
+RELOAD_STATS = ReloadStats()
+
+
+def reload_food_data() -> bool:
+    """
+    Loads the data file again if it has changed since FOOD_DATA was loaded, and
+    swaps the new data in. A file that fails to load leaves the old data in place.
+
+    Returns:
+        bool: Whether new data was swapped in.
+    """
+    global FOOD_DATA
+    signature = food_file_signature()
+    if signature is None or signature in (FOOD_DATA.signature, RELOAD_STATS.failed_signature):
+        return False
+    try:
+        data = load_food_data()
+    except (OSError, ValueError, IndexError):
+        RELOAD_STATS.failures += 1
+        RELOAD_STATS.failed_signature = signature
+        return False
+    start = time.perf_counter()
+    FOOD_DATA = data
+    RELOAD_STATS.last_swap_us = (time.perf_counter() - start) * 1e6
+    RELOAD_STATS.reloads += 1
+    print(
+        f"Reloaded {FOOD_DATA_FILE}: {len(data.foods.names)} foods in {data.load_ms:.1f} ms, "
+        f"swapped in {RELOAD_STATS.last_swap_us:.1f} µs"
+    )
+    return True
+
+
+def watch_food_file(interval: float = WATCH_INTERVAL) -> threading.Thread | None:
+    """
+    Starts a background thread that reloads the food data whenever the data file changes.
+
+    Args:
+        interval (float): How often to check the file, in seconds.
+    Returns:
+        threading.Thread | None: The watcher thread, or None if the file cannot be
+            inspected (for example, when running in a browser).
+    """
+    if food_file_signature() is None:
+        return None
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            reload_food_data()
+
+    watcher = threading.Thread(target=watch, name="food-file-watcher", daemon=True)
+    watcher.start()
+    return watcher
+
+
 def no_food_found_page(state: State) -> Page:
     """
     Displays a page indicating that no food items were found for the given search query.
@@ -184,29 +1248,217 @@ def make_food_button(food: Food) -> PageContent:
     )
 
 
+def page_buttons(url: str, arguments: list[Argument], page: int, last_page: int) -> list[PageContent]:
+    """
+    Creates the Previous and Next buttons for a page of results, leaving out the
+    ones that would go past the first or last page.
+
+    Args:
+        url (str): The route that shows the results.
+        arguments (list[Argument]): The route's arguments other than the page.
+        page (int): The page being shown, starting from 0.
+        last_page (int): The last page there is.
+    Returns:
+        list[PageContent]: The buttons to show.
+    """
+    buttons = []
+    if page > 0:
+        buttons.append(Button("Previous", url, arguments=arguments + [Argument("page", page - 1)]))
+    if page < last_page:
+        buttons.append(Button("Next", url, arguments=arguments + [Argument("page", page + 1)]))
+    return buttons
+
+
 @route
-def search(state: State, query: str):
+def search(state: State, query: str, search_by: str = SEARCH_MODES[0], page: int = 0):
     """
-    Searches for food items that match the given query and displays the results.
-    If no results are found, an error message is displayed.
+    Searches for food items that match the given query and displays one page of the
+    results, best matches first. If nothing contains the query, foods that match it
+    up to a few typos are shown instead, and if there are none of those either, an
+    error message is displayed. Searches by protein or category are handed to
+    protein_at_least (or top_foods, for a blank query) and category_top_foods.
 
     Args:
         state (State): The current state of the application.
         query (str): The search query string.
+        search_by (str): One of SEARCH_MODES.
+        page (int): Which page of results to show, starting from 0.
     Returns:
         Page: A page displaying the search results or an error message.
     """
-    results = find_foods(FOODS, query)
-    if not results:
+    if search_by == "protein at least":
+        if not query.strip():
+            return top_foods(state, page)
+        try:
+            minimum = float(query)
+        except ValueError:
+            return no_food_found_page(state)
+        return protein_at_least(state, minimum, page)
+    if search_by == "category":
+        return category_top_foods(state, query)
+    data = FOOD_DATA
+    rows, close = cached_search(SEARCH_CACHE, data.index, data.fuzzy, query)
+    heading = f"Search results for '{query}'"
+    if close:
+        heading = f"No exact matches for '{query}'; showing close matches"
+    if not rows:
         return no_food_found_page(state)
+    last_page = (len(rows) - 1) // RESULTS_PER_PAGE
+    page = max(0, min(page, last_page))
+    start = page * RESULTS_PER_PAGE
+    if close:
+        best = rows[: start + RESULTS_PER_PAGE]
+    else:
+        best = rank_foods(data.index, query, rows, start + RESULTS_PER_PAGE)
     buttons = []
-    for food in results:
-        buttons.append(make_food_button(food))
+    for row in best[start:]:
+        buttons.append(make_food_button(food_row(data.foods, row)))
+    navigation = page_buttons("search", [Argument("query", query)], page, last_page)
     return Page(
         state,
         [
-            Header(f"Search results for '{query}'"),
+            Header(heading),
+            f"Showing {start + 1}-{start + len(buttons)} of {len(rows)}",
             BulletedList(buttons),
+            *navigation,
+            Button("Back", "index"),
+        ],
+    )
+
+
+@route
+def top_foods(state: State, page: int = 0):
+    """
+    Displays one page of every food, highest protein first.
+
+    Args:
+        state (State): The current state of the application.
+        page (int): Which page of foods to show, starting from 0.
+    Returns:
+        Page: A page listing the highest-protein foods.
+    """
+    return protein_list_page(state, FOOD_DATA, "Highest-protein foods", float("-inf"), page, "top_foods", [])
+
+
+@route
+def protein_at_least(state: State, minimum: float, page: int = 0):
+    """
+    Displays one page of the foods with at least the given protein content,
+    highest protein first.
+
+    Args:
+        state (State): The current state of the application.
+        minimum (float): The least protein content in grams.
+        page (int): Which page of foods to show, starting from 0.
+    Returns:
+        Page: A page listing the matching foods, or an error message if there are none
+            or the minimum is not a finite number.
+    """
+    data = FOOD_DATA
+    if not math.isfinite(minimum) or not count_at_least(data.stats, minimum):
+        return no_food_found_page(state)
+    heading = f"Foods with at least {minimum}g protein"
+    return protein_list_page(state, data, heading, minimum, page, "protein_at_least", [Argument("minimum", minimum)])
+
+
+def protein_list_page(
+    state: State, data: FoodData, heading: str, minimum: float, page: int, url: str, arguments: list[Argument]
+) -> Page:
+    """
+    Builds one page of the foods with at least the given protein content, highest
+    protein first, for top_foods and protein_at_least.
+
+    Args:
+        state (State): The current state of the application.
+        data (FoodData): The food data to list.
+        heading (str): The title of the page.
+        minimum (float): The least protein content in grams.
+        page (int): Which page of foods to show, starting from 0.
+        url (str): The route that shows the other pages.
+        arguments (list[Argument]): That route's arguments other than the page.
+    Returns:
+        Page: A page listing the foods.
+    """
+    total = count_at_least(data.stats, minimum)
+    last_page = max(total - 1, 0) // RESULTS_PER_PAGE
+    page = max(0, min(page, last_page))
+    start = page * RESULTS_PER_PAGE
+    rows = highest_protein(data.stats, start, min(RESULTS_PER_PAGE, total - start))
+    buttons = [make_food_button(food_row(data.foods, row)) for row in rows]
+    navigation = page_buttons(url, arguments, page, last_page)
+    return Page(
+        state,
+        [
+            Header(heading),
+            f"Showing {start + 1}-{start + len(buttons)} of {total}",
+            BulletedList(buttons),
+            *navigation,
+            Button("Back", "index"),
+        ],
+    )
+
+
+@route
+def category_top_foods(state: State, category: str, count: int = 20):
+    """
+    Displays the protein statistics of one category, a histogram of its foods'
+    protein content, and its highest-protein foods.
+
+    Args:
+        state (State): The current state of the application.
+        category (str): The category to show, in any case.
+        count (int): How many of the highest-protein foods to list.
+    Returns:
+        Page: A page summarizing the category, or an error message if there is no such category.
+    """
+    stats = FOOD_DATA.stats
+    name = find_category(stats, category)
+    summary = category_summary(stats, name, count) if name is not None else None
+    if summary is None:
+        return no_food_found_page(state)
+    return Page(
+        state,
+        [
+            Header(f"Top {len(summary.top)} in {summary.category}"),
+            f"{summary.count} foods, mean {summary.mean:.2f}g protein, median {summary.median:.2f}g protein",
+            "Protein per food:",
+            BulletedList(histogram_lines(category_histogram(stats, summary.category))),
+            BulletedList([make_food_button(food) for food in summary.top]),
+            Button("Back", "index"),
+        ],
+    )
+
+
+@route
+def diagnostics(state: State):
+    """
+    Shows how well the search cache is working, to help choose its size, and how
+    the food data has been reloaded.
+
+    Args:
+        state (State): The current state of the application.
+    Returns:
+        Page: A page listing the search cache's and the reloads' counters.
+    """
+    cache = SEARCH_CACHE
+    data = FOOD_DATA
+    swap = RELOAD_STATS.last_swap_us
+    lookups = cache.hits + cache.misses
+    hit_rate = f"{cache.hits / lookups:.1%}" if lookups else "n/a"
+    return Page(
+        state,
+        [
+            Header("Search cache"),
+            f"Cached queries: {len(cache.results)} of {cache.capacity}",
+            f"Hits: {cache.hits}",
+            f"Misses: {cache.misses}",
+            f"Hit rate: {hit_rate}",
+            f"Evictions: {cache.evictions}",
+            f"Invalidations: {cache.invalidations}",
+            Header("Food data"),
+            f"Foods: {len(data.foods.names)}, loaded and indexed in {data.load_ms:.1f} ms",
+            f"Reloads: {RELOAD_STATS.reloads} ({RELOAD_STATS.failures} failed)",
+            f"Last swap: {swap:.1f} µs" if swap is not None else "Last swap: n/a",
             Button("Back", "index"),
         ],
     )
@@ -224,9 +1476,11 @@ def add_food(state: State, food_id: int):
         Page: The main page of the application with the updated selected foods.
     """
     if food_id not in state.food_items:
-        state.food_items.append(food_id)
+        state.food_items[food_id] = None
 
     return index(state)
 
 
-start_server(State([]))
\ No newline at end of file
+if __name__ == "__main__":
+    watch_food_file()
+    start_server(State({}))